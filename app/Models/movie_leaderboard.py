@@ -0,0 +1,94 @@
+from datetime import datetime, timezone
+from bson import json_util
+from app.Models.movie_model import DEFAULT_LIST_VIEW, PROJECTIONS
+
+LEADERBOARD_COLLECTION = 'movie_leaderboard'
+META_ID = 'meta'
+
+# ✅ Precomputed top movies per scope: all movies, a genre, a release year or both
+LEADERBOARD_SIZE = 100
+TOP_SORT = [('ratings', -1), ('total_rating', -1)]
+# Stored boards and the aggregate past them must order ties the same way, or rows repeat or go
+# missing at the page LEADERBOARD_SIZE boundary
+TOP_SORT_WITH_ID = TOP_SORT + [('_id', 1)]
+SCOPE_FIELDS = {'genres', 'release_year'}
+LEADERBOARD_PROJECTION = PROJECTIONS[DEFAULT_LIST_VIEW]
+# A change to any of these can move a movie on (or off) a leaderboard
+LEADERBOARD_FIELDS = set(LEADERBOARD_PROJECTION) | {'ratings', 'total_rating'}
+
+
+def scope_key(scope):
+    return json_util.dumps(scope, sort_keys=True)
+
+
+def top_pipeline(scope, limit):
+    # Bounded sort: with the (scope, ratings, total_rating) indexes MongoDB reads only `limit` entries
+    return [
+        {'$match': scope},
+        {'$sort': dict(TOP_SORT_WITH_ID)},
+        {'$limit': limit},
+        {'$project': LEADERBOARD_PROJECTION}
+    ]
+
+
+def invalidate_leaderboards(db):
+    # Every stored leaderboard built before this generation is rebuilt on its next read.
+    # With a Motor database this returns the awaitable for the caller to await.
+    return db[LEADERBOARD_COLLECTION].update_one({"_id": META_ID}, {"$inc": {"generation": 1}}, upsert=True)
+
+
+def refresh_leaderboard(db, scope, generation):
+    movies = list(db['movies'].aggregate(top_pipeline(scope, LEADERBOARD_SIZE)))
+    # Scopes without movies (e.g. a misspelt genre) are not worth storing
+    if movies:
+        db[LEADERBOARD_COLLECTION].replace_one(
+            {"_id": scope_key(scope)},
+            {"scope": scope, "generation": generation, "movies": movies, "refreshed_at": datetime.now(timezone.utc)},
+            upsert=True
+        )
+    return movies
+
+
+def is_expired(board, max_age_seconds):
+    # Writes from outside the app never bump the generation, so boards also expire by age
+    refreshed_at = board.get('refreshed_at')
+    if not max_age_seconds or refreshed_at is None:
+        return False
+    if refreshed_at.tzinfo is None:
+        refreshed_at = refreshed_at.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - refreshed_at).total_seconds() > max_age_seconds
+
+
+def get_leaderboard(db, scope, skip=0, limit=10, max_age_seconds=None):
+    """Top movies for a scope, read from the leaderboard and rebuilt when out of date or too old."""
+    key = scope_key(scope)
+    docs = {doc["_id"]: doc for doc in db[LEADERBOARD_COLLECTION].find({"_id": {"$in": [key, META_ID]}})}
+    generation = docs.get(META_ID, {}).get('generation', 0)
+
+    board = docs.get(key)
+    if board is None or board.get('generation') != generation or is_expired(board, max_age_seconds):
+        movies = refresh_leaderboard(db, scope, generation)
+    else:
+        movies = board['movies']
+    return movies[skip:skip + limit]
+
+
+def refresh_movie_leaderboards(db, movie_id):
+    """Called after a movie's rating changes: rebuilds the stored leaderboards it belongs to."""
+    invalidate_leaderboards(db)
+    meta = db[LEADERBOARD_COLLECTION].find_one({"_id": META_ID}) or {}
+    movie = db['movies'].find_one({"_id": movie_id}, {"genres": 1, "release_year": 1})
+    if not movie:
+        return
+
+    year = movie.get('release_year')
+    scopes = [{}, {'release_year': year}]
+    for genre in movie.get('genres') or []:
+        scopes += [{'genres': genre}, {'genres': genre, 'release_year': year}]
+
+    # Only scopes somebody has read; the others are built lazily
+    keys = [scope_key(scope) for scope in scopes]
+    stored = {doc["_id"] for doc in db[LEADERBOARD_COLLECTION].find({"_id": {"$in": keys}}, {"_id": 1})}
+    for scope, key in zip(scopes, keys):
+        if key in stored:
+            refresh_leaderboard(db, scope, meta.get('generation', 0))
@@ -1,88 +1,210 @@
-import os
 from datetime import datetime
-from bson import ObjectId
-from pymongo import MongoClient
-from dotenv import load_dotenv
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
 from flask import Flask, request, jsonify
+from app.config import Config
+from app.db.db import init_db, get_db
+from app.Utils.custom_error import CustomError
+from app.Utils.json_provider import MongoJSONProvider
+from app.Models.movie_stats import get_stats, mark_stats_dirty
+from app.Models.movie_search import SEARCH_FIELD, with_search_fields
 
-# ✅ Load environment variables
-load_dotenv()
+# ✅ Standalone app shares the same pooled connection setup as create_app()
+app = Flask(__name__)
+app.config.from_object(Config)
+app.json = MongoJSONProvider(app)
+init_db(app)
 
-# ✅ Connect to MongoDB using my-db and movies collection
-CONN_STR = os.getenv("CONN_STR")
-if not CONN_STR:
-    raise ValueError("❗ Connection string not found in environment variables.")
+# ✅ Named projection profiles ('full' returns the whole document minus internal fields)
+# 'title' is kept next to 'name' because older documents created through the API use it
+PROJECTIONS = {
+    'summary': {'name': 1, 'title': 1, 'release_year': 1, 'genres': 1, 'ratings': 1, 'price': 1},
+    'card': {'name': 1, 'title': 1, 'release_year': 1, 'genres': 1, 'ratings': 1, 'price': 1,
+             'total_rating': 1, 'duration': 1, 'directors': 1, 'cover_image': 1},
+    'full': {SEARCH_FIELD: 0},
+}
+DEFAULT_LIST_VIEW = 'summary'
 
-client = MongoClient(CONN_STR)
-db = client['my-db']
-movies_collection = db['movies']
+# ✅ Incremented by every write through the API, sent in the ETag ("v3-<hash>") for If-Match
+VERSION_FIELD = 'version'
+
+# ✅ Stored type of every public Movie field (list fields hold values of this type)
+# Query parameters are coerced with these before they reach MongoDB
+FIELD_TYPES = {
+    '_id': ObjectId,
+    'name': str,
+    'title': str,
+    'description': str,
+    'duration': int,
+    'ratings': float,
+    'total_rating': int,
+    'release_year': int,
+    'release_date': datetime,
+    'created_at': datetime,
+    'genres': str,
+    'directors': str,
+    'cover_image': str,
+    'actors': str,
+    'price': float,
+    'created_by': str,
+    VERSION_FIELD: int,
+}
+
+# ✅ Movie bodies (create, PATCH, bulk) are validated against the same field types
+# 'name' is the movie's title field; 'title' is still accepted as an alias of it
+REQUIRED_FIELDS = ('name', 'release_year')
+TITLE_ALIAS = 'title'
+LIST_FIELDS = {'genres', 'directors', 'actors'}
+# Managed by the server, dropped from client bodies
+SERVER_FIELDS = {VERSION_FIELD, SEARCH_FIELD}
+CREATE_DEFAULTS = {'total_rating': 0}
+# The Movie model (standalone POST /movies) keeps its stricter constructor: every descriptive field
+# is required and the optional ones default as they always did
+MODEL_REQUIRED_FIELDS = REQUIRED_FIELDS + ('description', 'duration', 'genres', 'directors', 'cover_image',
+                                           'actors', 'price')
+MODEL_DEFAULTS = {**CREATE_DEFAULTS, 'ratings': None, 'release_date': None, 'created_by': 'Nana Kwasi'}
+MOVIE_FIELDS = tuple(field for field in FIELD_TYPES if field not in (TITLE_ALIAS, VERSION_FIELD))
+
+
+def _to_str(value):
+    if type(value) is not str:
+        raise TypeError(value)
+    return value
+
+
+def _to_int(value):
+    # bool is an int subclass, so check the exact type
+    if type(value) is int:
+        return value
+    if type(value) is float and value.is_integer():
+        return int(value)
+    if type(value) is str:
+        return int(value)
+    raise TypeError(value)
+
+
+def _to_float(value):
+    if type(value) is float or type(value) is int:
+        return float(value)
+    if type(value) is str:
+        return float(value)
+    raise TypeError(value)
+
+
+def _to_datetime(value):
+    if isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(value)
+
+
+def _to_str_list(value):
+    # set(map(type, ...)) checks every item without a Python-level loop
+    if type(value) is not list or not set(map(type, value)) <= {str}:
+        raise TypeError(value)
+    return value
+
+
+_COERCERS = {str: _to_str, int: _to_int, float: _to_float, datetime: _to_datetime, ObjectId: ObjectId}
+# (type that is stored as is, coercer for anything else); list items always need a check
+FIELD_SPECS = {
+    field: (None, _to_str_list) if field in LIST_FIELDS else (FIELD_TYPES[field], _COERCERS[FIELD_TYPES[field]])
+    for field in MOVIE_FIELDS
+}
+
+
+def validate_movie(data, partial=False, required=REQUIRED_FIELDS, defaults=CREATE_DEFAULTS):
+    """Checks and coerces a movie body in one pass and returns the document to store.
+
+    With partial=True (PATCH) only the given fields are checked and nothing is required.
+    """
+    if not isinstance(data, dict):
+        raise CustomError("Not a valid movie object", 400)
+
+    movie = {}
+    for field, value in data.items():
+        spec = FIELD_SPECS.get(field)
+        if spec is None:
+            if field in SERVER_FIELDS:
+                continue
+            if field != TITLE_ALIAS:
+                raise CustomError(f"Unknown movie field '{field}'", 400)
+            if 'name' in data and data['name'] != value:
+                raise CustomError("'title' is an alias of 'name', send only one of them", 400)
+            field, spec = 'name', FIELD_SPECS['name']
+        elif partial and field == '_id':
+            continue
+
+        # Values that already have the stored type (the common case) skip the coercer
+        if type(value) is spec[0]:
+            movie[field] = value
+        elif value is None and field not in required:
+            movie[field] = None
+        else:
+            try:
+                movie[field] = spec[1](value)
+            except (ValueError, TypeError, InvalidId):
+                raise CustomError(f"Invalid value for '{field}': {value!r}", 400)
+
+    if not partial:
+        for field in required:
+            if movie.get(field) is None:
+                raise CustomError(f"Missing required field '{field}'", 400)
+        for field, default in defaults.items():
+            movie.setdefault(field, default)
+        movie.setdefault('created_at', datetime.now())
+    return movie
+
+
+_UNSET = object()
 
-app = Flask(__name__)
 
 class Movie:
-    def __init__(self, name, description, duration, release_year, genres, directors, cover_image, actors, price, ratings=None, total_rating=0, release_date=None, created_by='Nana Kwasi'):
-        self.name = name
-        self.description = description
-        self.duration = duration
-        self.ratings = ratings
-        self.total_rating = total_rating
-        self.release_year = release_year
-        self.release_date = release_date
-        self.created_at = datetime.now()
-        self.genres = genres
-        self.directors = directors
-        self.cover_image = cover_image
-        self.actors = actors
-        self.price = price
-        self.created_by = created_by
+    """A validated movie; __slots__ keeps large batches small in memory."""
+    __slots__ = MOVIE_FIELDS
+
+    def __init__(self, **fields):
+        for field, value in validate_movie(fields, required=MODEL_REQUIRED_FIELDS, defaults=MODEL_DEFAULTS).items():
+            setattr(self, field, value)
 
     def to_dict(self):
-        return self.__dict__
+        # A new dict every call; fields that were never set are left out
+        document = {}
+        for field in MOVIE_FIELDS:
+            value = getattr(self, field, _UNSET)
+            if value is not _UNSET:
+                document[field] = value
+        return document
 
     @property
     def duration_in_hours(self):
         return round(self.duration / 60, 2)
 
-# ✅ Validate JSON array data
-def validate_list(value, field_name):
-    if not isinstance(value, list) or not all(isinstance(i, str) for i in value):
-        raise ValueError(f"{field_name} must be a list of strings.")
-
 # ✅ Route to insert a movie
 @app.route('/movies', methods=['POST'])
 def insert_movie():
     try:
         movie_data = request.json
         movie = Movie(**movie_data)
-        validate_list(movie.genres, 'Genres')
-        validate_list(movie.directors, 'Directors')
-        validate_list(movie.actors, 'Actors')
-        result = movies_collection.insert_one(movie.to_dict())
+        result = get_db()['movies'].insert_one(with_search_fields({**movie.to_dict(), VERSION_FIELD: 1}))
+        mark_stats_dirty(get_db())
+        # movie_leaderboard imports this module, so import it here to avoid a cycle
+        from app.Models.movie_leaderboard import invalidate_leaderboards
+        invalidate_leaderboards(get_db())
         return jsonify({"message": "Movie inserted", "id": str(result.inserted_id)}), 201
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
-# ✅ Route to get movie stats using aggregation
+# ✅ Route to get movie stats (read from the materialized movie_stats collection)
 @app.route('/movies/stats', methods=['GET'])
 def get_movie_stats():
     try:
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$release_year",
-                    "avg_price": {"$avg": "$price"},
-                    "min_price": {"$min": "$price"},
-                    "max_price": {"$max": "$price"},
-                    "avg_rating": {"$avg": "$ratings"},
-                    "min_rating": {"$min": "$ratings"},
-                    "max_rating": {"$max": "$ratings"},
-                    "price_total": {"$sum": "$price"},
-                    "movie_total": {"$sum": 1}
-                }
-            }
-        ]
-        stats = list(movies_collection.aggregate(pipeline))
-        return jsonify(stats)
+        # limit=0: every release year, like the old per-request $group
+        data, staleness = get_stats(get_db(), app.config['STATS_MAX_STALENESS_SECONDS'], ['release_year'], limit=0)
+        # Same bare list of {_id: release_year, ...} rows as before; how fresh it is goes in headers
+        response = jsonify([{"_id": row.pop("key"), **row} for row in data['release_year']])
+        response.headers['X-Stats-As-Of'] = staleness['as_of'].isoformat() if staleness['as_of'] else ''
+        response.headers['X-Stats-Pending-Writes'] = str(staleness['pending_writes'])
+        return response
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -0,0 +1,57 @@
+import re
+from app.Utils.custom_error import CustomError
+
+# ✅ Edge n-gram side index for fast prefix/autocomplete search
+# Every word of the title is stored with all of its prefixes ("ince", "incep", ...)
+# in one multikey-indexed array, so a prefix lookup is a plain index equality match.
+SEARCH_FIELD = 'search_prefixes'
+PREFIX_SOURCE_FIELDS = ('name', 'title')
+MAX_PREFIX_LENGTH = 15
+
+# ✅ Weighted text index fields for relevance-ranked full-text search
+TEXT_INDEX_WEIGHTS = {'name': 10, 'title': 10, 'actors': 5, 'directors': 5, 'description': 1}
+
+_WORD = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return _WORD.findall(text.lower())
+
+
+def edge_ngrams(doc):
+    prefixes = set()
+    for field in PREFIX_SOURCE_FIELDS:
+        value = doc.get(field)
+        if isinstance(value, str):
+            for word in tokenize(value):
+                prefixes.update(word[:n] for n in range(1, min(len(word), MAX_PREFIX_LENGTH) + 1))
+    return sorted(prefixes)
+
+
+def with_search_fields(doc):
+    # Called on every insert path so new movies are searchable right away
+    if any(field in doc for field in PREFIX_SOURCE_FIELDS):
+        doc[SEARCH_FIELD] = edge_ngrams(doc)
+    return doc
+
+
+def search_fields_for_update(current, data):
+    """Search fields to $set when an update renames a movie, else {}."""
+    if not any(field in data for field in PREFIX_SOURCE_FIELDS):
+        return {}
+    merged = {field: data.get(field, (current or {}).get(field)) for field in PREFIX_SOURCE_FIELDS}
+    return {SEARCH_FIELD: edge_ngrams(merged)}
+
+
+def prefix_query(q):
+    # "star wa" -> every token must be the prefix of some word in the title
+    tokens = [token[:MAX_PREFIX_LENGTH] for token in tokenize(q)]
+    if not tokens:
+        raise CustomError("Search query must contain letters or digits", 400)
+    if len(tokens) == 1:
+        return {SEARCH_FIELD: tokens[0]}
+    return {SEARCH_FIELD: {'$all': tokens}}
+
+
+def text_query(q):
+    return {'$text': {'$search': q}}
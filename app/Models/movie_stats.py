@@ -0,0 +1,148 @@
+import logging
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+STATS_COLLECTION = 'movie_stats'
+META_ID = 'meta'
+
+# ✅ Breakdowns kept in the materialized stats collection
+# (field, is_array) -> list fields are unwound so each genre/director gets its own row
+BREAKDOWNS = {
+    'release_year': ('$release_year', False),
+    'genre': ('$genres', True),
+    'director': ('$directors', True),
+}
+
+STATS_GROUP = {
+    "avg_price": {"$avg": "$price"},
+    "min_price": {"$min": "$price"},
+    "max_price": {"$max": "$price"},
+    "avg_rating": {"$avg": "$ratings"},
+    "min_rating": {"$min": "$ratings"},
+    "max_rating": {"$max": "$ratings"},
+    "price_total": {"$sum": "$price"},
+    "movie_total": {"$sum": 1}
+}
+
+# ✅ Only one rebuild runs at a time across every worker and node: the rebuilder holds a
+# lease on the meta document, which expires in case it dies halfway
+REBUILD_LEASE_SECONDS = 600
+
+# One background rebuild thread per process
+_rebuild_running = threading.Lock()
+
+
+def mark_stats_dirty(db, seen_by_watcher=False):
+    # One tiny write per movie write; readers compare it with the last rebuild.
+    # With a Motor database this returns the awaitable for the caller to await.
+    # The change watcher also counts its own marks, so its polling can tell them apart.
+    inc = {"writes": 1, "watcher_writes": 1} if seen_by_watcher else {"writes": 1}
+    return db[STATS_COLLECTION].update_one({"_id": META_ID}, {"$inc": inc}, upsert=True)
+
+
+def acquire_rebuild_lease(db, owner, lease_seconds=REBUILD_LEASE_SECONDS):
+    now = datetime.now(timezone.utc)
+    db[STATS_COLLECTION].update_one({"_id": META_ID}, {"$setOnInsert": {"writes": 0}}, upsert=True)
+    return db[STATS_COLLECTION].find_one_and_update(
+        {"_id": META_ID, "$or": [{"lease_until": {"$exists": False}}, {"lease_until": {"$lt": now}}]},
+        {"$set": {"lease_owner": owner, "lease_until": now + timedelta(seconds=lease_seconds)}}
+    ) is not None
+
+
+def _holds_lease(db, owner):
+    return db[STATS_COLLECTION].count_documents({"_id": META_ID, "lease_owner": owner}) == 1
+
+
+def rebuild_stats(db):
+    """Recomputes every breakdown with $merge and records what it covers.
+
+    Returns False without doing anything when another process holds the rebuild lease.
+    """
+    run_id = uuid.uuid4().hex
+    if not acquire_rebuild_lease(db, run_id):
+        return False
+
+    try:
+        meta = db[STATS_COLLECTION].find_one({"_id": META_ID}) or {}
+        writes_at_start = meta.get('writes', 0)
+
+        for kind, (field, is_array) in BREAKDOWNS.items():
+            pipeline = [{"$unwind": field}] if is_array else []
+            pipeline += [
+                {"$group": {"_id": {"kind": kind, "key": field}, **STATS_GROUP}},
+                {"$addFields": {"run_id": run_id}},
+                {"$merge": {"into": STATS_COLLECTION, "whenMatched": "replace", "whenNotMatched": "insert"}}
+            ]
+            db['movies'].aggregate(pipeline)
+            # An expired lease means another rebuild may have merged since: its rows must stay
+            if not _holds_lease(db, run_id):
+                logging.warning("❗ Stats rebuild lease expired, leaving the rows to the newer rebuild")
+                return False
+            # Rows from older runs belong to keys that no longer exist
+            db[STATS_COLLECTION].delete_many({"_id.kind": kind, "run_id": {"$ne": run_id}})
+
+        db[STATS_COLLECTION].update_one(
+            {"_id": META_ID, "lease_owner": run_id},
+            {"$set": {"rebuilt_at": datetime.now(timezone.utc), "built_from_writes": writes_at_start}}
+        )
+        return True
+    finally:
+        db[STATS_COLLECTION].update_one(
+            {"_id": META_ID, "lease_owner": run_id}, {"$unset": {"lease_owner": "", "lease_until": ""}}
+        )
+
+
+def _rebuild_in_background(db):
+    try:
+        rebuild_stats(db)
+    except Exception as e:
+        logging.warning(f"❗ Background stats rebuild failed: {e}")
+    finally:
+        _rebuild_running.release()
+
+
+def refresh_in_background(db):
+    # Readers never wait for the three $group passes: they get the current rows meanwhile
+    if _rebuild_running.acquire(blocking=False):
+        threading.Thread(target=_rebuild_in_background, args=(db,), name='movie-stats-rebuild', daemon=True).start()
+
+
+def get_stats(db, max_staleness_seconds, breakdowns=None, limit=100):
+    """Reads the materialized stats; stale stats are still served while a rebuild runs in the background."""
+    meta = db[STATS_COLLECTION].find_one({"_id": META_ID})
+    rebuilding = _is_stale(meta, max_staleness_seconds)
+    if rebuilding:
+        refresh_in_background(db)
+
+    data = {}
+    for kind in breakdowns or BREAKDOWNS:
+        sort = [("_id.key", 1)] if kind == 'release_year' else [("movie_total", -1)]
+        rows = db[STATS_COLLECTION].find({"_id.kind": kind}, {"run_id": 0}).sort(sort).limit(limit)
+        data[kind] = [{"key": row.pop("_id")["key"], **row} for row in rows]
+
+    # Never built yet: empty until the first rebuild finishes
+    rebuilt_at = _as_utc(meta['rebuilt_at']) if meta and 'rebuilt_at' in meta else None
+    pending_writes = (meta or {}).get('writes', 0) - (meta or {}).get('built_from_writes', 0)
+    staleness = {
+        "as_of": rebuilt_at,
+        "age_seconds": round((datetime.now(timezone.utc) - rebuilt_at).total_seconds(), 3) if rebuilt_at else None,
+        "max_staleness_seconds": max_staleness_seconds,
+        "pending_writes": max(pending_writes, 0),
+        "rebuilding": rebuilding
+    }
+    return data, staleness
+
+
+def _is_stale(meta, max_staleness_seconds):
+    if not meta or 'rebuilt_at' not in meta:
+        return True
+    if meta.get('writes', 0) <= meta.get('built_from_writes', 0):
+        return False
+    age = (datetime.now(timezone.utc) - _as_utc(meta['rebuilt_at'])).total_seconds()
+    return age > max_staleness_seconds
+
+
+def _as_utc(value):
+    # pymongo returns naive UTC datetimes unless the client is tz_aware
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
@@ -1,50 +1,419 @@
+import base64
+import binascii
+import hashlib
+from bson import json_util
+from flask import g, has_request_context
+from pymongo.errors import ExecutionTimeout
+from app.Utils.custom_error import CustomError
+from app.Utils.query_compiler import bind_filter, compile_filter, compile_sort
+from app.Utils.response_cache import MemoryCache
+from app.Models.movie_model import LIST_FIELDS, PROJECTIONS
+
+DEFAULT_SORT = [('created_at', -1)]
+DEFAULT_PAGE_LIMIT = 100
+# Query parameters that control the response rather than filter documents
+RESERVED_PARAMS = ['page', 'sort', 'limit', 'fields', 'view', 'cursor', 'stream', 'q', 'mode', 'facets', 'total']
+# ✅ ?total=exact counts the filtered documents inside the same aggregate as the page
+TOTAL_FACET = {'total': [{'$count': 'count'}]}
+TOTAL_MODES = ['estimate', 'exact']
+
+# Estimated totals when there is no shared response cache to keep them in
+_count_cache = MemoryCache(max_entries=1024, max_bytes=1024 * 1024)
+
+
+def clear_count_cache():
+    _count_cache.clear()
+
+
+# ✅ Stages the builder emits, in the order they are sent to MongoDB ($skip/$limit share a slot)
+STAGE_ORDER = {'$match': 0, '$sort': 1, '$skip': 2, '$limit': 2, '$addFields': 3, '$project': 3}
+
+
+def merge_matches(matches):
+    merged = {}
+    for match in matches:
+        if not match:
+            continue
+        if merged.keys() & match.keys():
+            merged = {'$and': [merged, match]}
+        else:
+            merged.update(match)
+    return merged
+
+
+def optimize_pipeline(stages):
+    """Normalizes builder stages to $match -> $sort -> $limit/$skip -> $project.
+
+    Matches are merged and empty stages dropped. $skip s + $limit l become
+    {$limit: s + l}, {$skip: s} right after the $sort, so MongoDB runs a top-k sort
+    that only keeps s + l documents, and the projection runs on the page alone.
+    Stages from the first other kind (e.g. $facet) on are kept as they are.
+    """
+    end, window_seen = len(stages), False
+    for index, stage in enumerate(stages):
+        name = next(iter(stage))
+        # A $match or $sort after the page window would change the result if moved
+        if name not in STAGE_ORDER or (window_seen and STAGE_ORDER[name] < 2):
+            end = index
+            break
+        window_seen = window_seen or STAGE_ORDER[name] == 2
+
+    matches, sort, skip, limit, shapes = [], None, 0, None, []
+    for stage in stages[:end]:
+        name, spec = next(iter(stage.items()))
+        if name == '$match':
+            matches.append(spec)
+        elif name == '$sort':
+            sort = spec or sort
+        elif name == '$skip':
+            skip += spec
+            if limit is not None:
+                limit = max(0, limit - spec)
+        elif name == '$limit':
+            limit = spec if limit is None else min(limit, spec)
+        elif spec:
+            shapes.append(stage)
+
+    pipeline = []
+    match = merge_matches(matches)
+    if match:
+        pipeline.append({'$match': match})
+    if sort:
+        pipeline.append({'$sort': sort})
+    if limit is not None:
+        pipeline.append({'$limit': skip + limit})
+    if skip:
+        pipeline.append({'$skip': skip})
+    return pipeline + shapes + stages[end:]
+
+
+def has_unbounded_sort(pipeline):
+    # A $sort without a $limit right after it holds every matching document in memory
+    for index, stage in enumerate(pipeline):
+        if '$sort' in stage and not (index + 1 < len(pipeline) and '$limit' in pipeline[index + 1]):
+            return True
+        if '$facet' in stage and any(has_unbounded_sort(stages) for stages in stage['$facet'].values()):
+            return True
+    return False
+
+
+def init_pipeline_debug(app):
+    """QUERY_DEBUG_HEADERS: send the pipeline and options MongoDB actually ran as headers."""
+    if not app.config['QUERY_DEBUG_HEADERS']:
+        return
+
+    @app.after_request
+    def pipeline_headers(response):
+        if 'query_pipeline' in g:
+            response.headers['X-Query-Pipeline'] = json_util.dumps(g.query_pipeline)
+            response.headers['X-Query-Options'] = json_util.dumps(g.query_options)
+        return response
+
+
+def page_limit(query_params, max_limit=None):
+    """?limit as a positive number, capped at max_limit so one request can't ask for everything."""
+    try:
+        limit = int(query_params.get('limit', DEFAULT_PAGE_LIMIT))
+    except ValueError:
+        raise CustomError("'limit' must be a number", 400)
+    if limit < 1:
+        raise CustomError("'limit' must be at least 1", 400)
+    return min(limit, max_limit) if max_limit else limit
+
+
+def page_number(query_params):
+    """?page as a number from 1 up."""
+    try:
+        page = int(query_params.get('page', 1))
+    except ValueError:
+        raise CustomError("'page' must be a number", 400)
+    if page < 1:
+        raise CustomError("'page' must be at least 1", 400)
+    return page
+
+
+def query_timeout():
+    return CustomError("Query took too long, add filters or ask for a smaller page", 503)
+
+
 class ApiFeatures:
-    def __init__(self, collection, query_params):
+    def __init__(self, collection, query_params, index_mode='off', max_limit=None, max_time_ms=0,
+                 allow_disk_use='auto'):
         self.collection = collection
         self.query_params = query_params
+        # ✅ Server-side cap on ?limit= (MAX_PAGE_LIMIT)
+        self.max_limit = max_limit
+        # ✅ Query policies: server time limit for pages (0 = none) and 'auto'/'always'/'never' disk use
+        self.max_time_ms = max_time_ms
+        self.allow_disk_use = allow_disk_use
         self.pipeline = []
+        self.sort_fields = []
+        self.equality_fields = set()
+        # ✅ 'off', 'reject' or 'downgrade' for fields without a supporting index
+        self.index_mode = index_mode
+        # ✅ Keyset (cursor) pagination is used when the client sends ?cursor=
+        self.is_cursor_mode = 'cursor' in query_params
+        self.next_cursor = None
+        self._limit = None
+        # ✅ Extra $facet outputs computed in the same round trip as the page
+        self.facets = None
+        self.facet_results = {}
 
     def filter(self):
-        query_obj = {k: v for k, v in self.query_params.items() if k not in ['page', 'sort', 'limit', 'fields']}
-        
-        mongo_query = {}
-        for key, value in query_obj.items():
-            if '__' in key:
-                field, operator = key.split('__')
-                operator_map = {'gte': '$gte', 'gt': '$gt', 'lte': '$lte', 'lt': '$lt'}
-                if operator in operator_map:
-                    mongo_query[field] = {operator_map[operator]: float(value)}
-            else:
-                mongo_query[key] = value
-        
+        # Parsing and validation are cached per query shape (the sorted parameter names)
+        keys = tuple(sorted(k for k in self.query_params.keys() if k not in RESERVED_PARAMS))
+        terms = compile_filter(keys, self.index_mode)
+        mongo_query = bind_filter(terms, self.query_params)
+        self.equality_fields.update(field for field, value in mongo_query.items() if not isinstance(value, dict))
+
         self.pipeline.append({'$match': mongo_query})
         return self
 
-    def sort(self):
-        sort_by = self.query_params.get('sort')
-        if sort_by:
-            sort_fields = [(field.lstrip('-'), -1 if field.startswith('-') else 1) for field in sort_by.split(',')]
-            self.pipeline.append({'$sort': dict(sort_fields)})
+    def match(self, condition):
+        # Adds a route-level condition (e.g. a $text search) to the leading $match,
+        # where MongoDB can use an index for it
+        self.equality_fields.update(
+            key for key, value in condition.items() if not key.startswith('$') and not isinstance(value, dict)
+        )
+        if self.pipeline and '$match' in self.pipeline[0]:
+            # A client filter on the same field (e.g. ?genres= on /movies-by-genre) must still apply
+            self.pipeline[0]['$match'] = merge_matches([self.pipeline[0]['$match'], condition])
         else:
-            self.pipeline.append({'$sort': {'created_at': -1}})
+            self.pipeline.insert(0, {'$match': dict(condition)})
         return self
 
-    def limit_fields(self):
-        fields = self.query_params.get('fields')
-        if fields:
-            field_list = fields.split(',')
-            projection = {field: 1 for field in field_list}
-            self.pipeline.append({'$project': projection})
+    def sort(self, default=None):
+        default_sort = list(default or DEFAULT_SORT)
+        sort_by = self.query_params.get('sort')
+        compiled = compile_sort(sort_by, frozenset(self.equality_fields), self.index_mode) if sort_by else None
+        sort_fields = list(compiled) if compiled else default_sort
+
+        # A list field sorts by its smallest/largest item, which no single cursor value can resume from
+        if self.is_cursor_mode and any(field in LIST_FIELDS for field, _ in sort_fields):
+            raise CustomError(f"Cursor pagination can't sort by {', '.join(sorted(LIST_FIELDS))}, use ?page=", 400)
+
+        # Cursor mode needs a unique, total order, so _id breaks ties
+        if self.is_cursor_mode and '_id' not in dict(sort_fields):
+            sort_fields.append(('_id', 1))
+
+        self.sort_fields = sort_fields
+        self.pipeline.append({'$sort': dict(sort_fields)})
         return self
 
+    def limit_fields(self, default_view='full', extra=None):
+        projection = self.projection(self.query_params, default_view)
+        is_inclusion = any(value for value in projection.values())
+        # The next cursor is built from the sort keys, so keep them in the output
+        if self.is_cursor_mode and is_inclusion:
+            projection.update({field: 1 for field, _ in self.sort_fields})
+        # Computed fields such as {'score': {'$meta': 'textScore'}}
+        if extra and is_inclusion:
+            projection.update(extra)
+        elif extra:
+            self.pipeline.append({'$addFields': extra})
+        # build() moves the projection after the page window, so it only shapes the page
+        self.pipeline.append({'$project': projection})
+        return self
+
+    @staticmethod
+    def projection(query_params, default_view='full'):
+        # ?fields=a,b wins over ?view=summary|card|full, which wins over the route default
+        fields = query_params.get('fields')
+        if fields:
+            return {field: 1 for field in fields.split(',')}
+
+        view = query_params.get('view', default_view)
+        if view not in PROJECTIONS:
+            raise CustomError(f"Unknown view '{view}', use one of: {', '.join(PROJECTIONS)}", 400)
+        # A copy, so drivers and callers never modify the shared profile
+        return dict(PROJECTIONS[view])
+
     def paginate(self):
-        page = int(self.query_params.get('page', 1))
-        limit = int(self.query_params.get('limit', 100))
+        limit = page_limit(self.query_params, self.max_limit)
+        self._limit = limit
+
+        if self.is_cursor_mode:
+            token = self.query_params.get('cursor')
+            if token:
+                self._insert_before_sort({'$match': self._cursor_match(self._decode_cursor(token))})
+            # Fetch one extra document to know whether there is a next page
+            self.pipeline.append({'$limit': limit + 1})
+            return self
+
+        page = page_number(self.query_params)
         skip = (page - 1) * limit
 
         self.pipeline.append({'$skip': skip})
         self.pipeline.append({'$limit': limit})
         return self
 
+    def facet(self, facets):
+        """Runs {name: sub-pipeline} next to the page, all over the same $match.
+
+        Call last: every stage after the leading $match becomes the 'data' facet.
+        """
+        if facets:
+            start = 1 if self.pipeline and '$match' in self.pipeline[0] else 0
+            self.facets = dict(facets)
+            data = optimize_pipeline(self.pipeline[start:])
+            self.pipeline = self.pipeline[:start] + [{'$facet': {'data': data, **self.facets}}]
+        return self
+
+    def build(self):
+        """The optimized pipeline sent to MongoDB (self.pipeline keeps the builder's stages)."""
+        return optimize_pipeline(self.pipeline)
+
+    def aggregate_options(self, pipeline, streamed=False):
+        options = {}
+        # Streamed exports may legitimately run for a long time
+        if self.max_time_ms and not streamed:
+            options['maxTimeMS'] = self.max_time_ms
+        if self.allow_disk_use == 'always' or (self.allow_disk_use == 'auto' and has_unbounded_sort(pipeline)):
+            options['allowDiskUse'] = True
+        elif self.allow_disk_use == 'never':
+            options['allowDiskUse'] = False
+        if has_request_context():
+            g.query_pipeline, g.query_options = pipeline, options
+        return options
+
+    def _aggregate(self, streamed=False, **kwargs):
+        pipeline = self.build()
+        return self.collection.aggregate(pipeline, **self.aggregate_options(pipeline, streamed), **kwargs)
+
     def execute(self):
-        return list(self.collection.aggregate(self.pipeline))
+        try:
+            return self._page_results(list(self._aggregate()))
+        except ExecutionTimeout:
+            raise query_timeout()
+
+    def exact_total(self):
+        # Set by the 'total' facet (TOTAL_FACET); $count emits nothing for zero matches
+        rows = self.facet_results.get('total') or [{}]
+        return rows[0].get('count', 0)
+
+    def estimated_total(self, cache=None, ttl=60):
+        """Collection metadata when unfiltered, else a count cached per filter for ttl seconds."""
+        match = self._filter_match()
+        if not match:
+            return self.collection.estimated_document_count()
+
+        cache = cache or _count_cache
+        key = self._count_key(match)
+        total = cache.get(key)
+        if total is None:
+            total = self.collection.count_documents(match)
+            cache.set(key, total, ttl)
+        return total
+
+    def _filter_match(self):
+        # The leading $match holds the filters; a later one is the cursor range
+        return self.pipeline[0]['$match'] if self.pipeline and '$match' in self.pipeline[0] else {}
+
+    def _count_key(self, match):
+        signature = json_util.dumps(match, sort_keys=True)
+        return f"counts:{self.collection.name}:{hashlib.sha256(signature.encode()).hexdigest()[:32]}"
+
+    def _page_results(self, results):
+        if self.facets:
+            # $facet returns a single document: {'data': [...], <facet>: [...]}
+            output = results[0] if results else {}
+            self.facet_results = {name: output.get(name, []) for name in self.facets}
+            results = output.get('data', [])
+
+        if self.is_cursor_mode:
+            self.next_cursor = None
+            if len(results) > self._limit:
+                results = results[:self._limit]
+                self.next_cursor = self._encode_cursor(results[-1])
+        return results
+
+    def stream(self, batch_size=500):
+        # Iterate the cursor lazily instead of materializing the whole result
+        return self._aggregate(streamed=True, batchSize=batch_size)
+
+    # ✅ Keyset pagination helpers
+
+    def _insert_before_sort(self, stage):
+        for index, existing in enumerate(self.pipeline):
+            if '$sort' in existing:
+                self.pipeline.insert(index, stage)
+                return
+        self.pipeline.append(stage)
+
+    def _sort_signature(self):
+        return [[field, direction] for field, direction in self.sort_fields]
+
+    def _encode_cursor(self, document):
+        values = [self._get_path(document, field) for field, _ in self.sort_fields]
+        payload = json_util.dumps({'s': self._sort_signature(), 'v': values})
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def _decode_cursor(self, token):
+        try:
+            padded = token + '=' * (-len(token) % 4)
+            payload = json_util.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+            sort_signature, values = payload['s'], payload['v']
+        except (ValueError, KeyError, TypeError, binascii.Error):
+            raise CustomError("Invalid cursor", 400)
+
+        # Values go straight into the $match: a crafted token must not smuggle in operators
+        if not isinstance(values, list) or any(isinstance(value, (dict, list)) for value in values):
+            raise CustomError("Invalid cursor", 400)
+        if sort_signature != self._sort_signature() or len(values) != len(self.sort_fields):
+            raise CustomError("Cursor does not match the requested sort", 400)
+        return values
+
+    def _cursor_match(self, values):
+        # (a, b, _id) > (va, vb, vid) becomes:
+        #   a > va  OR  (a == va AND b > vb)  OR  (a == va AND b == vb AND _id > vid)
+        branches = []
+        equal_prefix = {}
+        for (field, direction), value in zip(self.sort_fields, values):
+            condition = self._after_condition(field, direction, value)
+            if condition is not None:
+                branches.append({**equal_prefix, **condition})
+            equal_prefix[field] = value
+        # Nothing sorts after the cursor: match no documents
+        return {'$or': branches} if branches else {'_id': {'$exists': False}}
+
+    @staticmethod
+    def _after_condition(field, direction, value):
+        # null/missing sorts before every other value in MongoDB
+        if value is None:
+            return {field: {'$ne': None}} if direction == 1 else None
+        if direction == 1:
+            return {field: {'$gt': value}}
+        return {'$or': [{field: {'$lt': value}}, {field: None}]}
+
+    @staticmethod
+    def _get_path(document, path):
+        value = document
+        for part in path.split('.'):
+            if not isinstance(value, dict):
+                return None
+            value = value.get(part)
+        return value
+
+
+class AsyncApiFeatures(ApiFeatures):
+    """Same pipeline builder, executed on the async driver (Motor)."""
+
+    async def execute(self):
+        try:
+            results = await self._aggregate().to_list(length=None)
+        except ExecutionTimeout:
+            raise query_timeout()
+        return self._page_results(results)
+
+    async def estimated_total(self, cache=None, ttl=60):
+        match = self._filter_match()
+        if not match:
+            return await self.collection.estimated_document_count()
+
+        cache = cache or _count_cache
+        key = self._count_key(match)
+        total = cache.get(key)
+        if total is None:
+            total = await self.collection.count_documents(match)
+            cache.set(key, total, ttl)
+        return total
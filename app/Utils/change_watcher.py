@@ -0,0 +1,178 @@
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from pymongo.errors import DuplicateKeyError, OperationFailure, PyMongoError
+from app.Utils.api_features import clear_count_cache
+from app.Utils.response_cache import invalidate_cache
+from app.Models.movie_leaderboard import invalidate_leaderboards
+from app.Models.movie_model import VERSION_FIELD
+from app.Models.movie_stats import META_ID, STATS_COLLECTION, mark_stats_dirty
+
+TOKENS_COLLECTION = 'change_stream_tokens'
+TOKEN_ID = 'movies'
+# Lease naming the one watcher (across every worker and node) that invalidates shared derived data
+LEADER_ID = 'derived-data-leader'
+
+# $changeStream needs a replica set or sharded cluster
+CHANGE_STREAMS_UNSUPPORTED = {40573}
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class ChangeWatcher:
+    """Invalidates caches and derived data whenever the movies collection changes.
+
+    Every worker runs one background thread on a change stream, so writes from
+    other workers, other nodes or scripts invalidate its cache too. The resume
+    token is stored in MongoDB so a restarted worker first catches up on what it
+    missed. Without change streams (standalone mongod) it polls a cheap
+    fingerprint of the collection instead.
+
+    Every watcher drops its own worker's caches. Leaderboards and stats live in
+    MongoDB and are shared, so only the watcher holding a lease invalidates them,
+    and only for changes the API write paths (which keep them fresh) didn't make.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.poll_interval = app.config['CHANGE_POLL_INTERVAL_SECONDS']
+        self.mode = None
+        self._id = uuid.uuid4().hex
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def ensure_started(self):
+        # Threads don't survive a fork, so every gunicorn worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._stop = threading.Event()
+            threading.Thread(target=self._run, name='movies-change-watcher', daemon=True).start()
+
+    def stop(self):
+        self._stop.set()
+
+    @property
+    def db(self):
+        return self.app.extensions['mongo'].db
+
+    def invalidate(self, outside_write=True):
+        with self.app.app_context():
+            invalidate_cache('movies')
+        clear_count_cache()
+        # Writes from other tools never went through the write paths that keep these fresh
+        if outside_write and self.is_leader():
+            invalidate_leaderboards(self.db)
+            mark_stats_dirty(self.db, seen_by_watcher=True)
+
+    def is_leader(self):
+        # Takes or renews the lease; it lapses if its holder stops seeing changes or dies
+        now = datetime.now(timezone.utc)
+        lease_seconds = max(30, 10 * self.poll_interval)
+        try:
+            self.db[TOKENS_COLLECTION].find_one_and_update(
+                {"_id": LEADER_ID, "$or": [{"owner": self._id}, {"lease_until": {"$lt": now}}]},
+                {"$set": {"owner": self._id, "lease_until": now + timedelta(seconds=lease_seconds)}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            # Another watcher holds a valid lease (the upsert collided with its document)
+            return False
+        return True
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                if self.mode == 'poll':
+                    self._poll()
+                else:
+                    self._watch()
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    logging.info("✅ Change streams unavailable (standalone mongod), polling movies for changes")
+                    self.mode = 'poll'
+                elif e.code == CHANGE_STREAM_HISTORY_LOST:
+                    # The oplog no longer has our resume point: start fresh, drop everything cached
+                    logging.warning("❗ Change stream resume token expired, invalidating caches")
+                    self.db[TOKENS_COLLECTION].delete_one({"_id": TOKEN_ID})
+                    self.invalidate()
+                else:
+                    logging.warning(f"❗ Change stream failed: {e}")
+                    self._stop.wait(self.poll_interval)
+            except PyMongoError as e:
+                logging.warning(f"❗ Change watcher lost MongoDB: {e}")
+                self._stop.wait(self.poll_interval)
+            except Exception as e:
+                if self.mode == 'poll':
+                    logging.warning(f"❗ Polling movies for changes failed: {e}")
+                    self._stop.wait(self.poll_interval)
+                else:
+                    # Clients without change stream support (e.g. mongomock)
+                    logging.info(f"✅ Change streams unavailable ({e.__class__.__name__}), polling movies for changes")
+                    self.mode = 'poll'
+
+    def _watch(self):
+        saved = self.db[TOKENS_COLLECTION].find_one({"_id": TOKEN_ID})
+        options = {'resume_after': saved['token']} if saved else {}
+        with self.db['movies'].watch(max_await_time_ms=int(self.poll_interval * 1000), **options) as stream:
+            self.mode = 'watch'
+            while not self._stop.is_set() and stream.alive:
+                # Drain a burst of changes, then invalidate once for all of them
+                changed = outside_write = False
+                change = stream.try_next()
+                while change is not None:
+                    changed = True
+                    outside_write = outside_write or not made_by_api(change)
+                    change = stream.try_next()
+                if changed:
+                    self.invalidate(outside_write)
+                    self.db[TOKENS_COLLECTION].replace_one(
+                        {"_id": TOKEN_ID}, {"token": stream.resume_token}, upsert=True
+                    )
+
+    def fingerprint(self):
+        # Every API write and insert_movie bumps the stats write counter; count and the
+        # newest created_at also catch inserts and deletes made by other tools.
+        # Marks made by the watchers themselves are left out, or workers would keep
+        # invalidating each other.
+        meta = self.db[STATS_COLLECTION].find_one({"_id": META_ID}, {"writes": 1, "watcher_writes": 1}) or {}
+        writes = meta.get('writes', 0) - meta.get('watcher_writes', 0)
+        newest = self.db['movies'].find_one({}, {"created_at": 1}, sort=[("created_at", -1)]) or {}
+        return writes, self.db['movies'].estimated_document_count(), newest.get('created_at')
+
+    def _poll(self):
+        last = self.fingerprint()
+        while not self._stop.wait(self.poll_interval):
+            current = self.fingerprint()
+            if current != last:
+                # Only the write counter moved: the API made the change and kept derived data fresh
+                self.invalidate(outside_write=current[1:] != last[1:])
+                last = current
+
+
+def made_by_api(change):
+    # API writes always set the version; deletes carry no document, so they count as outside
+    operation = change.get('operationType')
+    if operation == 'update':
+        return VERSION_FIELD in change.get('updateDescription', {}).get('updatedFields', {})
+    if operation in ('insert', 'replace'):
+        return VERSION_FIELD in (change.get('fullDocument') or {})
+    return False
+
+
+def init_change_watcher(app):
+    if not app.config['CHANGE_WATCH_ENABLED']:
+        app.extensions['change_watcher'] = None
+        return
+
+    watcher = ChangeWatcher(app)
+    app.extensions['change_watcher'] = watcher
+
+    @app.before_request
+    def start_change_watcher():
+        watcher.ensure_started()
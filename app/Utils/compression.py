@@ -0,0 +1,149 @@
+import gzip
+import zlib
+from flask import g, request
+from app.Utils.response_cache import get_cache
+
+# ✅ brotli and zstandard are optional: without them only gzip is offered
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on the environment
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on the environment
+    zstandard = None
+
+COMPRESSIBLE_MIMETYPES = {'application/json', 'application/x-ndjson', 'text/html', 'text/plain', 'text/css',
+                          'application/javascript'}
+
+
+def compress(encoding, data, level):
+    if encoding == 'gzip':
+        # mtime=0 keeps the output identical for identical bodies
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    if encoding == 'br':
+        return brotli.compress(data, quality=level)
+    if encoding == 'zstd':
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    raise ValueError(f"Unsupported encoding {encoding}")
+
+
+class _GzipStream:
+    def __init__(self, level):
+        # wbits=31 writes a gzip header and trailer
+        self._obj = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self, level):
+        self._obj = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self._obj.process(data)
+
+    def finish(self):
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level):
+        self._obj = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, data):
+        return self._obj.compress(data)
+
+    def finish(self):
+        return self._obj.flush()
+
+
+STREAM_COMPRESSORS = {'gzip': _GzipStream, 'br': _BrotliStream, 'zstd': _ZstdStream}
+
+
+def available_encodings(preferred):
+    """Configured encodings whose library is installed, in server preference order."""
+    installed = {'gzip': True, 'br': brotli is not None, 'zstd': zstandard is not None}
+    return [encoding for encoding in preferred if installed.get(encoding)]
+
+
+def negotiate(accept_encodings, encodings):
+    # Highest client q-value wins, the server's order breaks ties; q=0 means "not acceptable"
+    best, best_quality = None, 0
+    for encoding in encodings:
+        quality = accept_encodings[encoding]
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress_stream(chunks, encoding, level):
+    # Streamed bodies (NDJSON exports) are compressed chunk by chunk, never buffered whole
+    compressor = STREAM_COMPRESSORS[encoding](level)
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def init_compression(app):
+    """Compresses responses by Accept-Encoding (zstd, br, gzip) above a size threshold."""
+    if not app.config['COMPRESSION_ENABLED']:
+        return
+
+    encodings = available_encodings([e.strip() for e in app.config['COMPRESSION_ALGORITHMS'].split(',') if e.strip()])
+    levels = {
+        'gzip': app.config['COMPRESSION_GZIP_LEVEL'],
+        'br': app.config['COMPRESSION_BROTLI_LEVEL'],
+        'zstd': app.config['COMPRESSION_ZSTD_LEVEL'],
+    }
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+
+    @app.after_request
+    def compress_response(response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = negotiate(request.accept_encodings, encodings)
+        if encoding is None:
+            return response
+        level = levels[encoding]
+
+        if response.is_streamed:
+            if encoding not in STREAM_COMPRESSORS:
+                return response
+            response.response = compress_stream(response.response, encoding, level)
+            response.headers.pop('Content-Length', None)
+        else:
+            body = response.get_data()
+            if len(body) < min_size:
+                return response
+
+            # Cached responses keep their compressed bytes next to them (same versioned key)
+            cache_key = g.get('response_cache_key')
+            cache = get_cache() if cache_key else None
+            compressed_key = f"{cache_key}|{encoding}:{level}"
+            compressed = cache.get(compressed_key) if cache is not None else None
+            if compressed is None:
+                compressed = compress(encoding, body, level)
+                if cache is not None:
+                    cache.set(compressed_key, compressed, app.config['CACHE_TTL_SECONDS'], size=len(compressed))
+            response.set_data(compressed)
+
+        response.headers['Content-Encoding'] = encoding
+        # The compressed bytes are a different representation, so the ETag becomes weak
+        etag, is_weak = response.get_etag()
+        if etag and not is_weak:
+            response.set_etag(etag, weak=True)
+        return response
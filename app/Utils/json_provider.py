@@ -0,0 +1,73 @@
+import base64
+import json
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from bson import DBRef, Decimal128, ObjectId, Regex, Timestamp
+from bson.binary import Binary
+from flask.json.provider import DefaultJSONProvider
+
+# ✅ Use orjson when it is installed, otherwise fall back to the stdlib json module
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+
+def bson_default(o):
+    """Converts BSON/Python types that JSON does not know about."""
+    if isinstance(o, ObjectId):
+        return str(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    if isinstance(o, Decimal128):
+        return str(o.to_decimal())
+    if isinstance(o, Decimal):
+        return str(o)
+    if isinstance(o, uuid.UUID):
+        return str(o)
+    if isinstance(o, (Binary, bytes)):
+        return base64.b64encode(o).decode()
+    if isinstance(o, Timestamp):
+        return o.as_datetime().isoformat()
+    if isinstance(o, Regex):
+        return o.pattern
+    if isinstance(o, DBRef):
+        return {"$ref": o.collection, "$id": bson_default(o.id) if isinstance(o.id, ObjectId) else o.id}
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """JSON provider that serializes raw MongoDB documents directly."""
+
+    # Keep MongoDB's field order instead of sorting keys on every response
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if orjson is not None and not kwargs:
+            return self.dumps_bytes(obj).decode()
+        kwargs.setdefault('default', bson_default)
+        kwargs.setdefault('ensure_ascii', self.ensure_ascii)
+        kwargs.setdefault('sort_keys', self.sort_keys)
+        return json.dumps(obj, **kwargs)
+
+    def dumps_bytes(self, obj, indent=False):
+        if orjson is None:
+            return json.dumps(obj, default=bson_default, ensure_ascii=self.ensure_ascii,
+                              sort_keys=self.sort_keys, indent=2 if indent else None).encode()
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=bson_default, option=option)
+
+    def loads(self, s, **kwargs):
+        if orjson is not None and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = self.compact is False or (self.compact is None and self._app.debug)
+        return self._app.response_class(self.dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype)
@@ -0,0 +1,138 @@
+import logging
+import os
+import time
+from flask import Response, g, has_request_context, request
+from pymongo import monitoring
+
+# ✅ prometheus_client is optional: without it only the slow-request log is available
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:  # pragma: no cover - depends on the environment
+    prometheus_client = None
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000, 10000)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_metrics = {}
+
+
+def _build_metrics():
+    if _metrics or prometheus_client is None:
+        return _metrics
+    _metrics.update(
+        latency=prometheus_client.Histogram(
+            'http_request_duration_seconds', 'Total request latency', ['method', 'route', 'status'], buckets=LATENCY_BUCKETS),
+        db_time=prometheus_client.Histogram(
+            'http_request_db_seconds', 'Time spent in MongoDB commands per request', ['route'], buckets=LATENCY_BUCKETS),
+        db_commands=prometheus_client.Histogram(
+            'http_request_db_commands', 'MongoDB commands per request', ['route'], buckets=COUNT_BUCKETS),
+        response_bytes=prometheus_client.Histogram(
+            'http_response_bytes', 'Response body size', ['route'], buckets=BYTES_BUCKETS),
+        documents=prometheus_client.Histogram(
+            'http_response_documents', 'Documents returned by MongoDB per request', ['route'], buckets=COUNT_BUCKETS),
+        # Coalescing ratio = follower / (leader + follower + timeout)
+        coalescing=prometheus_client.Counter(
+            'http_coalesced_requests', 'Cache misses by single-flight outcome', ['route', 'outcome']),
+        rejected=prometheus_client.Counter(
+            'http_rejected_requests', 'Requests turned away by admission control', ['route', 'reason']),
+    )
+    return _metrics
+
+
+def record_coalescing(outcome):
+    # leader: ran the view, follower: shared a leader's response, timeout: waited too long and ran its own
+    if _metrics:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        _metrics['coalescing'].labels(route, outcome).inc()
+
+
+def record_rejection(reason):
+    # rate_limited: the client's token bucket was empty (429), overloaded: in-flight cap reached (503)
+    if _metrics:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        _metrics['rejected'].labels(route, reason).inc()
+
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Adds DB time, command count and returned documents to the current request."""
+
+    def started(self, event):
+        if has_request_context() and event.command_name in ('aggregate', 'find'):
+            # Keep the query for the slow-request log
+            g.setdefault('mongo_commands', []).append(
+                {event.command_name: event.command.get(event.command_name),
+                 "pipeline": event.command.get('pipeline'),
+                 "filter": event.command.get('filter')}
+            )
+
+    def succeeded(self, event):
+        if not has_request_context():
+            return
+        self._record(event)
+        cursor = event.reply.get('cursor') if hasattr(event.reply, 'get') else None
+        if cursor:
+            batch = cursor.get('firstBatch', cursor.get('nextBatch', []))
+            g.db_documents = g.get('db_documents', 0) + len(batch)
+
+    def failed(self, event):
+        if has_request_context():
+            self._record(event)
+
+    @staticmethod
+    def _record(event):
+        g.db_seconds = g.get('db_seconds', 0.0) + event.duration_micros / 1e6
+        g.db_commands = g.get('db_commands', 0) + 1
+
+
+def init_metrics(app):
+    app.extensions['mongo'].event_listeners.append(MongoCommandListener())
+    metrics = _build_metrics() if app.config['METRICS_ENABLED'] else {}
+    if app.config['METRICS_ENABLED'] and prometheus_client is None:
+        logging.warning("❗ METRICS_ENABLED is set but prometheus_client is not installed, /metrics is disabled")
+
+    slow_request_ms = app.config['SLOW_REQUEST_MS']
+
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        started = g.get('request_started')
+        if started is None:
+            return response
+
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        db_seconds = g.get('db_seconds', 0.0)
+        db_commands = g.get('db_commands', 0)
+        size = None if response.is_streamed else response.calculate_content_length()
+
+        if metrics and route != '/metrics':
+            metrics['latency'].labels(request.method, route, response.status_code).observe(elapsed)
+            metrics['db_time'].labels(route).observe(db_seconds)
+            metrics['db_commands'].labels(route).observe(db_commands)
+            metrics['documents'].labels(route).observe(g.get('db_documents', 0))
+            if size is not None:
+                metrics['response_bytes'].labels(route).observe(size)
+
+        if slow_request_ms and elapsed * 1000 >= slow_request_ms:
+            logging.warning(
+                f"🐢 Slow request {request.method} {request.full_path} took {elapsed * 1000:.1f} ms "
+                f"(db {db_seconds * 1000:.1f} ms in {db_commands} commands, {size} bytes): "
+                f"{app.json.dumps(g.get('mongo_commands', []))}"
+            )
+        return response
+
+    if metrics:
+        @app.route('/metrics')
+        def metrics_endpoint():
+            # With gunicorn, PROMETHEUS_MULTIPROC_DIR makes every worker write to shared files
+            if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+                registry = prometheus_client.CollectorRegistry()
+                multiprocess.MultiProcessCollector(registry)
+            else:
+                registry = prometheus_client.REGISTRY
+            return Response(prometheus_client.generate_latest(registry), mimetype=prometheus_client.CONTENT_TYPE_LATEST)
@@ -0,0 +1,108 @@
+import re
+from datetime import datetime
+from functools import lru_cache
+from bson.errors import InvalidId
+from bson.objectid import ObjectId
+from app.Utils.custom_error import CustomError
+from app.db.indexes import is_filter_supported, is_sort_supported
+from app.Models.movie_model import FIELD_TYPES
+
+# ✅ ?field__op=value operators; a bare ?field=value is 'eq'
+OPERATORS = {
+    'eq': '$eq',
+    'ne': '$ne',
+    'gt': '$gt',
+    'gte': '$gte',
+    'lt': '$lt',
+    'lte': '$lte',
+    'in': '$in',
+    'exists': '$exists',
+    'prefix': '$regex',
+}
+
+# Distinct query shapes kept compiled per worker
+QUERY_SHAPE_CACHE_SIZE = 1024
+
+
+def parse_bool(value):
+    if value.lower() in ['1', 'true']:
+        return True
+    if value.lower() in ['0', 'false']:
+        return False
+    raise ValueError(value)
+
+
+COERCERS = {
+    ObjectId: ObjectId,
+    str: str,
+    int: int,
+    float: float,
+    datetime: datetime.fromisoformat,
+}
+
+
+def unindexed(message, index_mode):
+    # Returns True when the caller should drop the unindexed field
+    if index_mode == 'reject':
+        raise CustomError(f"{message}: no supporting index", 400)
+    return index_mode == 'downgrade'
+
+
+@lru_cache(maxsize=QUERY_SHAPE_CACHE_SIZE)
+def compile_filter(keys, index_mode='off'):
+    """Compiles sorted filter parameter names into (key, field, operator) terms.
+
+    Only the parameter names make up the shape, so every request with the same
+    names (e.g. genres + ratings__gte) reuses it and just binds its values.
+    """
+    terms = []
+    for key in keys:
+        field, _, operator = key.partition('__')
+        operator = operator or 'eq'
+        if field not in FIELD_TYPES:
+            raise CustomError(f"Unknown filter field '{field}'", 400)
+        if operator not in OPERATORS:
+            raise CustomError(f"Unknown filter operator '{operator}', use one of: {', '.join(OPERATORS)}", 400)
+        if operator == 'prefix' and FIELD_TYPES[field] is not str:
+            raise CustomError(f"'{field}' is not a text field, prefix filters need one", 400)
+        if not is_filter_supported(field) and unindexed(f"Filtering on '{field}' is not supported", index_mode):
+            continue
+        terms.append((key, field, operator))
+    return tuple(terms)
+
+
+@lru_cache(maxsize=QUERY_SHAPE_CACHE_SIZE)
+def compile_sort(sort_by, equality_fields=frozenset(), index_mode='off'):
+    """Parses ?sort=a,-b into ((field, direction), ...), or None to use the route default."""
+    sort_fields = tuple((field.lstrip('-'), -1 if field.startswith('-') else 1) for field in sort_by.split(','))
+    for field, _ in sort_fields:
+        if field not in FIELD_TYPES:
+            raise CustomError(f"Unknown sort field '{field}'", 400)
+    if not is_sort_supported(sort_fields, equality_fields) and unindexed(f"Sorting by '{sort_by}' is not supported", index_mode):
+        return None
+    return sort_fields
+
+
+def bind_filter(terms, query_params):
+    """Builds the $match document from compiled terms and this request's values."""
+    query = {}
+    for key, field, operator in terms:
+        condition = query.setdefault(field, {})
+        condition[OPERATORS[operator]] = coerce(field, operator, query_params.get(key))
+
+    # {'$eq': v} alone becomes a plain equality so it reads like a normal filter
+    return {field: condition['$eq'] if list(condition) == ['$eq'] else condition for field, condition in query.items()}
+
+
+def coerce(field, operator, value):
+    try:
+        if operator == 'exists':
+            return parse_bool(value)
+        if operator == 'prefix':
+            # An anchored, case-sensitive regex can walk the index
+            return '^' + re.escape(value)
+        if operator == 'in':
+            return [COERCERS[FIELD_TYPES[field]](item) for item in value.split(',')]
+        return COERCERS[FIELD_TYPES[field]](value)
+    except (ValueError, TypeError, InvalidId):
+        raise CustomError(f"Invalid value for '{field}': {value!r}", 400)
@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from flask import g, jsonify, request
+from app.Utils.api_features import DEFAULT_PAGE_LIMIT
+from app.Utils.metrics import record_rejection
+
+# ✅ Tokens a request takes from its client's bucket (default 1)
+# List routes also scale with the page size: limit=1000 costs 10x limit=100
+ROUTE_COSTS = {
+    'movies.get_single_movie': 1,
+    'movies.create_movie': 1,
+    'movies.update_movie': 1,
+    'movies.delete_movie': 1,
+    'movies.get_all_movies': 2,
+    'movies.get_movies_by_genre': 2,
+    'movies.get_highest_rated': 2,
+    'movies.search_movies': 3,
+    'movies.get_movie_stats': 3,
+    'movies.explain_movies': 5,
+    'movies.bulk_create_movies': 20,
+    'movies.bulk_update_movies': 20,
+    'movies.bulk_delete_movies': 20,
+}
+PAGED_ROUTES = {'movies.get_all_movies', 'movies.get_movies_by_genre', 'movies.get_highest_rated', 'movies.search_movies'}
+# Never limited: the web page, static files and the Prometheus scrape
+EXEMPT_ENDPOINTS = {'index', 'static', 'metrics_endpoint'}
+API_KEY_HEADER = 'X-API-Key'
+
+
+class MemoryRateLimiter:
+    """Token buckets in this worker's memory (each worker gets the full rate)."""
+
+    def __init__(self, max_clients=100000):
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, cost, rate, burst):
+        """Returns (allowed, tokens left)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            # Most recently seen clients last; the idlest one is forgotten (its bucket refills anyway)
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+
+# Refill, take and store in one atomic step on the Redis server
+TOKEN_BUCKET_SCRIPT = """
+local rate, burst, cost, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3]), tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisRateLimiter:
+    """Shared token buckets, so the rate holds across every worker and node."""
+
+    def __init__(self, url, prefix='flask-api:ratelimit:'):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("❗ RATE_LIMIT_BACKEND='redis' needs the 'redis' package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.script = self.client.register_script(TOKEN_BUCKET_SCRIPT)
+        self.prefix = prefix
+
+    def take(self, key, cost, rate, burst):
+        allowed, tokens = self.script(keys=[self.prefix + key], args=[rate, burst, cost, time.time()])
+        return bool(allowed), float(tokens)
+
+
+def client_key():
+    # API clients are limited per key (hashed, never stored as is), everyone else per IP
+    # (the real client IP behind TRUSTED_PROXY_COUNT proxies, see create_app)
+    api_key = request.headers.get(API_KEY_HEADER)
+    if api_key:
+        return 'key:' + hashlib.sha256(api_key.encode()).hexdigest()[:32]
+    return f"ip:{request.remote_addr}"
+
+
+def request_cost(costs, max_limit):
+    cost = costs.get(request.endpoint, 1)
+    if request.endpoint in PAGED_ROUTES:
+        try:
+            limit = min(int(request.args.get('limit', DEFAULT_PAGE_LIMIT)), max_limit)
+        except ValueError:
+            # The route answers 400 for it
+            limit = DEFAULT_PAGE_LIMIT
+        cost *= max(1, math.ceil(limit / DEFAULT_PAGE_LIMIT))
+    return cost
+
+
+def rejected(message, status_code, retry_after, reason):
+    record_rejection(reason)
+    response = jsonify({"status": "fail", "message": message})
+    response.status_code = status_code
+    response.headers['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def init_rate_limit(app):
+    """Token-bucket rate limit per client plus a cap on requests in flight per worker.
+
+    The in-flight cap sheds load (503) before every thread is waiting on the MongoDB
+    pool; the rate limit (429) stops one client from using up the capacity of others.
+    """
+    rate = app.config['RATE_LIMIT_PER_SECOND']
+    burst = app.config['RATE_LIMIT_BURST']
+    costs = {**ROUTE_COSTS, **app.config['RATE_LIMIT_ROUTE_COSTS']}
+    max_limit = app.config['MAX_PAGE_LIMIT']
+
+    limiter = None
+    if app.config['RATE_LIMIT_ENABLED']:
+        backend = app.config['RATE_LIMIT_BACKEND']
+        if backend == 'redis':
+            limiter = RedisRateLimiter(app.config['RATE_LIMIT_REDIS_URL'])
+        elif backend == 'memory':
+            limiter = MemoryRateLimiter()
+        else:
+            # Any object with take(key, cost, rate, burst) -> (allowed, tokens left)
+            limiter = backend
+    app.extensions['rate_limiter'] = limiter
+
+    max_in_flight = app.config['MAX_IN_FLIGHT_REQUESTS']
+    in_flight = threading.BoundedSemaphore(max_in_flight) if max_in_flight else None
+    wait_seconds = app.config['IN_FLIGHT_WAIT_MS'] / 1000
+
+    @app.before_request
+    def admit_request():
+        if request.endpoint in EXEMPT_ENDPOINTS or request.method == 'OPTIONS':
+            return None
+
+        if limiter is not None:
+            # Costs above the burst could never be paid, charge the whole bucket instead
+            cost = min(request_cost(costs, max_limit), burst)
+            try:
+                allowed, tokens = limiter.take(client_key(), cost, rate, burst)
+            except Exception as e:
+                # A broken shared backend must not take the API down with it
+                logging.warning(f"❗ Rate limiter unavailable, request let through: {e}")
+                allowed, tokens = True, burst
+            if not allowed:
+                return rejected("Too many requests, slow down", 429, (cost - tokens) / rate, 'rate_limited')
+
+        if in_flight is not None:
+            # A short wait absorbs bursts; beyond that the worker is saturated
+            if not in_flight.acquire(timeout=wait_seconds):
+                return rejected("Server is busy, retry shortly", 503, 1, 'overloaded')
+            g.in_flight_slot = True
+        return None
+
+    @app.teardown_request
+    def release_request(exc):
+        if g.pop('in_flight_slot', False):
+            in_flight.release()
@@ -0,0 +1,231 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import current_app, g, make_response, request
+from app.Utils.metrics import record_coalescing
+from app.Utils.single_flight import SingleFlight
+
+
+class MemoryCache:
+    """In-process LRU cache with a TTL and entry/byte bounds."""
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, size, expires_at = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, size=0):
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (value, size, time.monotonic() + ttl)
+            self._bytes += size
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def get_version(self, namespace):
+        return self._versions.get(namespace, 0)
+
+    def bump_version(self, namespace):
+        with self._lock:
+            self._versions[namespace] = self._versions.get(namespace, 0) + 1
+            # Old versions can never be read again, free their memory right away
+            prefix = f"{namespace}:"
+            for key in [k for k in self._entries if k.startswith(prefix)]:
+                self._remove(key)
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+
+class RedisCache:
+    """Shared cache so every worker and node sees the same entries and versions.
+
+    Each entry is a Redis hash of plain fields (never unpickled), so whoever can
+    write to Redis still can't run code in the app.
+    """
+
+    def __init__(self, url, prefix='flask-api:cache:'):
+        try:
+            import redis
+        except ImportError:
+            raise ImportError("❗ CACHE_BACKEND='redis' needs the 'redis' package (pip install redis)")
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def get(self, key):
+        fields = self.client.hgetall(self.prefix + key)
+        kind = fields.get(b'type')
+        if kind == b'response':
+            return fields[b'body'], fields[b'mimetype'].decode(), fields[b'etag'].decode()
+        if kind == b'int':
+            return int(fields[b'value'])
+        if kind == b'bytes':
+            return fields[b'value']
+        return None
+
+    def set(self, key, value, ttl, size=0):
+        # Cached values: (body, mimetype, etag) responses, counts and compressed bodies
+        if isinstance(value, tuple):
+            body, mimetype, etag = value
+            fields = {'type': 'response', 'body': body, 'mimetype': mimetype, 'etag': etag}
+        elif isinstance(value, int):
+            fields = {'type': 'int', 'value': value}
+        elif isinstance(value, bytes):
+            fields = {'type': 'bytes', 'value': value}
+        else:
+            raise TypeError(f"❗ RedisCache can't store {type(value).__name__} values")
+        pipe = self.client.pipeline()
+        pipe.delete(self.prefix + key)
+        pipe.hset(self.prefix + key, mapping=fields)
+        pipe.expire(self.prefix + key, max(1, int(ttl)))
+        pipe.execute()
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+    def get_version(self, namespace):
+        return int(self.client.get(f"{self.prefix}version:{namespace}") or 0)
+
+    def bump_version(self, namespace):
+        # Entries of older versions are simply never read again and expire via TTL
+        self.client.incr(f"{self.prefix}version:{namespace}")
+
+
+def init_cache(app):
+    # Identical concurrent reads share one DB call, with or without a cache
+    app.extensions['single_flight'] = (
+        SingleFlight(app.config['COALESCE_MAX_WAIT_MS'] / 1000) if app.config['COALESCE_ENABLED'] else None
+    )
+
+    if not app.config['CACHE_ENABLED']:
+        # Still versioned, so coalesced requests never share a result from before a write
+        app.extensions['response_cache'] = None
+        app.extensions['cache_versions'] = MemoryCache(max_entries=0)
+        return
+
+    if app.config['CACHE_BACKEND'] == 'redis':
+        backend = RedisCache(app.config['CACHE_REDIS_URL'])
+    else:
+        backend = MemoryCache(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_MAX_BYTES'])
+    app.extensions['response_cache'] = backend
+
+
+def get_cache():
+    return current_app.extensions.get('response_cache')
+
+
+def cache_key(namespace):
+    # Same resource + same query args in any order -> same entry. Re-encoded, so a value
+    # containing '&' or '=' (?genres=Drama%26limit%3D50) can't pass for another query
+    args = urlencode(sorted(request.args.items(multi=True)))
+    cache = get_cache() or current_app.extensions['cache_versions']
+    version = cache.get_version(namespace)
+    return f"{namespace}:v{version}:{request.path}?{args}"
+
+
+def make_etag(body):
+    return hashlib.sha256(body).hexdigest()[:32]
+
+
+def render_entry(fn, args, kwargs):
+    """Runs the view once: (status, shareable entry or None when streamed, response)."""
+    response = make_response(fn(*args, **kwargs))
+    if response.is_streamed:
+        return response.status_code, None, response
+    body = response.get_data()
+    # Keep an ETag the view chose itself (e.g. a document version)
+    etag = response.get_etag()[0] or make_etag(body)
+    return response.status_code, (body, response.mimetype, etag), response
+
+
+def cached_response(namespace, unless=None):
+    """Caches successful JSON responses and answers If-None-Match with 304.
+
+    ``unless`` is an optional predicate; when it returns True the request
+    bypasses the cache (e.g. streaming exports). Misses go through the
+    single-flight layer, so identical concurrent requests run the view once.
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            single_flight = current_app.extensions.get('single_flight')
+            if (cache is None and single_flight is None) or (unless is not None and unless()):
+                return fn(*args, **kwargs)
+
+            key = cache_key(namespace)
+            entry = cache.get(key) if cache is not None else None
+            status, outcome = 200, 'HIT'
+            if entry is None:
+                outcome = 'MISS'
+                if single_flight is not None:
+                    (status, entry, response), flight = single_flight.do(key, lambda: render_entry(fn, args, kwargs))
+                    record_coalescing(flight)
+                    if flight == 'follower':
+                        outcome = 'COALESCED'
+                        if entry is None:
+                            # A streamed response can't be shared, render our own
+                            status, entry, response = render_entry(fn, args, kwargs)
+                            outcome = 'MISS'
+                else:
+                    status, entry, response = render_entry(fn, args, kwargs)
+
+                if outcome == 'MISS':
+                    if entry is None or status != 200:
+                        return response
+                    if cache is not None:
+                        cache.set(key, entry, current_app.config['CACHE_TTL_SECONDS'], size=len(entry[0]))
+
+            body, mimetype, etag = entry
+            if cache is not None and status == 200:
+                # Lets the compression layer cache its bytes next to this entry
+                g.response_cache_key = key
+            response = current_app.response_class(body, status=status, mimetype=mimetype)
+            response.set_etag(etag)
+            response.headers['X-Cache'] = outcome
+            return response.make_conditional(request) if status == 200 else response
+
+        return wrapper
+
+    return decorator
+
+
+def invalidate_cache(namespace):
+    (get_cache() or current_app.extensions['cache_versions']).bump_version(namespace)
@@ -0,0 +1,47 @@
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.failed = False
+
+
+class SingleFlight:
+    """Lets concurrent callers with the same key share one computation.
+
+    The first caller (the leader) runs the function; callers that arrive while
+    it is in flight wait up to max_wait seconds for its result instead of
+    running their own. State is per worker process.
+    """
+
+    def __init__(self, max_wait=2.0):
+        self.max_wait = max_wait
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Returns (result, outcome) with outcome 'leader', 'follower' or 'timeout'."""
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = self._calls[key] = _Call()
+
+        if is_leader:
+            try:
+                call.result = fn()
+            except BaseException:
+                call.failed = True
+                raise
+            finally:
+                with self._lock:
+                    self._calls.pop(key, None)
+                call.done.set()
+            return call.result, 'leader'
+
+        # Leader too slow or failed: run our own call rather than fail the request
+        if not call.done.wait(self.max_wait) or call.failed:
+            return fn(), 'timeout'
+        return call.result, 'follower'
@@ -2,38 +2,83 @@ from flask import Flask, jsonify, request, render_template
 from .routes.movie_routes import movie_bp
 from .Utils.custom_error import CustomError
 from .controllers.error_handler import global_error_handler
+from .config import Config
+from .db.db import init_db
+from .db.indexes import ensure_indexes
+from .Utils.response_cache import init_cache
+from .Utils.json_provider import MongoJSONProvider
+from .Utils.metrics import init_metrics
+from .Utils.compression import init_compression
+from .Utils.change_watcher import init_change_watcher
+from .Utils.rate_limit import init_rate_limit
+from .Utils.api_features import init_pipeline_debug
 from flask_cors import CORS
-from pymongo import MongoClient
-import os
+from werkzeug.exceptions import RequestEntityTooLarge
+from werkzeug.middleware.proxy_fix import ProxyFix
 import logging
 
-def create_app():
+def create_app(config=None):
     app = Flask(__name__)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    # ✅ Serialize ObjectId, datetime, Decimal128... straight from MongoDB documents
+    app.json = MongoJSONProvider(app)
     # app = Flask(__name__, template_folder='../templates', static_folder='../static') // if they are in root dir
     # You can configure CORS with more fine-grained control as needed:
     # CORS(app, resources={r"/api/*": {"origins": "http://example.com"}})
     # This would restrict CORS for the /api/* routes only to requests from http://example.com.
     CORS(app) 
 
+    # ✅ Behind reverse proxies, take the client IP/scheme/host from the headers they set
+    proxies = app.config['TRUSTED_PROXY_COUNT']
+    if proxies:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies, x_host=proxies, x_port=proxies)
+
     # ✅ Configure logging
     logging.basicConfig(level=logging.INFO)
 
-    # ✅ Connect to MongoDB
+    # ✅ Connect to MongoDB (one shared pool, created lazily in each worker)
     try:
-        conn_str = os.getenv('CONN_STR', 'mongodb://localhost:27017/movies_db')
-        client = MongoClient(conn_str)
-        app.db = client.get_database()
-        logging.info("✅ Connected to MongoDB successfully")
+        init_db(app)
+        logging.info("✅ MongoDB connection pool configured")
     except Exception as e:
-        logging.error(f"❗ Failed to connect to MongoDB: {e}")
+        logging.error(f"❗ Failed to configure MongoDB: {e}")
         raise e
 
+    # ✅ Per-route latency, DB time and payload metrics (registered first so timing covers everything)
+    init_metrics(app)
+
+    # ✅ Rate limit per client and shed load before the MongoDB pool saturates
+    init_rate_limit(app)
+
+    # ✅ Create the declared indexes (the app still starts if MongoDB is unreachable)
+    if app.config['MONGO_CREATE_INDEXES']:
+        try:
+            created = ensure_indexes(app.extensions['mongo'].db)
+            logging.info(f"✅ Movie indexes ready: {', '.join(created)}")
+        except Exception as e:
+            logging.warning(f"❗ Could not create movie indexes: {e}")
+
+    # ✅ Optional debug headers with the aggregation pipeline each request ran
+    init_pipeline_debug(app)
+
+    # ✅ Response cache for movie reads, kept coherent with writes made anywhere
+    init_cache(app)
+    init_change_watcher(app)
+
+    # ✅ gzip/brotli/zstd responses (runs before the metrics hook, so bytes on the wire are measured)
+    init_compression(app)
+
     # ✅ Middleware to parse JSON data
     @app.before_request
     def handle_json():
-        if request.method in ['POST', 'PUT', 'PATCH']:
+        # NDJSON bodies (bulk endpoints) are streamed by the controller instead
+        if request.method in ['POST', 'PUT', 'PATCH'] and request.mimetype != 'application/x-ndjson':
             try:
                 request.get_json() # This line is where the data is being fetched
+            except RequestEntityTooLarge:
+                return jsonify({"error": "Request body too large"}), 413
             except Exception as e:
                 logging.error(f"❗ Invalid JSON: {e}")
                 return jsonify({"error": "Invalid JSON"}), 400
@@ -0,0 +1,37 @@
+# ✅ Optional async (ASGI) serving mode: hypercorn app.asgi:app
+# The sync Flask app in run.py stays the default; this one needs quart, motor and an ASGI server.
+from quart import Quart, request
+from .config import Config
+from .db.async_db import init_async_db
+from .routes.async_movie_routes import async_movie_bp
+from .Utils.custom_error import CustomError
+from .Utils.json_provider import MongoJSONProvider
+import logging
+
+
+def create_async_app(config=None):
+    app = Quart(__name__)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    app.json = MongoJSONProvider(app)
+
+    # ✅ Configure logging
+    logging.basicConfig(level=logging.INFO)
+
+    # ✅ Connect to MongoDB with Motor (one pool per worker, created inside its event loop)
+    init_async_db(app)
+
+    # ✅ Using Blueprints for routing
+    app.register_blueprint(async_movie_bp, url_prefix='/api/v1/movies')
+
+    # ✅ 404 Error Handler
+    @app.errorhandler(404)
+    async def handle_404(e):
+        error = CustomError(f"Cannot find {request.path} on the server", 404)
+        return {"status": error.status, "message": str(error)}, error.status_code
+
+    return app
+
+
+app = create_async_app()
@@ -0,0 +1,418 @@
+"""Offline import/export of the whole movies catalogue (NDJSON, CSV or BSON dumps).
+
+    movies-catalogue import movies.ndjson --workers 8 --chunk-size 5000
+    movies-catalogue import dump/my-db/movies.bson --processes --resume
+    movies-catalogue export movies.csv
+
+Imports read the dump one chunk at a time and hand each chunk to a thread (or
+process) pool that validates it with the Movie schema and writes it with an
+unordered bulk_write, so memory stays bounded by workers x chunk size. A
+checkpoint file next to the dump records finished chunks; --resume continues
+from it after an interruption.
+"""
+import csv
+import io
+import json
+import os
+import struct
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+import bson
+import click
+from bson import json_util
+from bson.errors import InvalidBSON
+from flask import Flask
+from pymongo import InsertOne, ReplaceOne
+from pymongo.errors import BulkWriteError
+from app.config import Config
+from app.db.db import MongoPool
+from app.db.indexes import ensure_indexes
+from app.Utils.custom_error import CustomError
+from app.Utils.json_provider import MongoJSONProvider
+from app.Models.movie_model import LIST_FIELDS, MOVIE_FIELDS, VERSION_FIELD, validate_movie
+from app.Models.movie_leaderboard import invalidate_leaderboards
+from app.Models.movie_search import SEARCH_FIELD, with_search_fields
+from app.Models.movie_stats import mark_stats_dirty
+
+FORMATS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv', '.bson': 'bson'}
+CSV_COLUMNS = MOVIE_FIELDS + (VERSION_FIELD,)
+# genres/directors/actors are stored in one CSV cell, joined with this
+CSV_LIST_SEPARATOR = '|'
+DUPLICATE_KEY_ERROR = 11000
+MAX_ERROR_SAMPLES = 5
+PROGRESS_INTERVAL_SECONDS = 1
+
+json_provider = MongoJSONProvider(Flask(__name__))
+
+# Set once per worker process (or once for all threads)
+_pool = None
+
+
+def mongo_config(uri, db_name):
+    config = {key: getattr(Config, key) for key in dir(Config) if key.startswith('MONGO_')}
+    config.update(MONGO_URI=uri, MONGO_DB_NAME=db_name)
+    return config
+
+
+def _init_worker(config):
+    global _pool
+    _pool = MongoPool(config)
+
+
+def dump_format(path, fmt):
+    if fmt:
+        return fmt
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in FORMATS:
+        raise click.BadParameter(f"can't tell the format of {path}, pass --format", param_hint='PATH')
+    return FORMATS[extension]
+
+
+# ✅ Checkpoints
+
+def load_checkpoint(path, expected):
+    """Saved progress if it belongs to the same run (same dump, format and chunk size)."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as source:
+        saved = json.load(source)
+    for key, value in expected.items():
+        if saved.get(key) != value:
+            raise click.ClickException(f"{path} was written for {key}={saved.get(key)!r}, not {value!r}")
+    return saved
+
+
+def save_checkpoint(path, state):
+    # Write then rename, so a crash never leaves half a checkpoint behind
+    with open(f"{path}.tmp", 'w') as out:
+        json.dump(state, out)
+    os.replace(f"{path}.tmp", path)
+
+
+class ImportCheckpoint:
+    """Chunks finished so far. Chunks finish out of order, so it keeps the offset
+    after the last contiguous finished chunk plus the finished chunks beyond it."""
+
+    def __init__(self, path, identity, saved=None):
+        saved = saved or {}
+        self.path = path
+        self.identity = identity
+        self.next_chunk = saved.get('next_chunk', 0)
+        self.offset = saved.get('offset', 0)
+        # JSON keys are strings: {chunk number: offset after it}
+        self.done = {int(number): end for number, end in saved.get('done', {}).items()}
+        self.totals = saved.get('totals', {'written': 0, 'duplicates': 0, 'invalid': 0, 'failed': 0})
+
+    def complete(self, number, end, stats):
+        for key in self.totals:
+            self.totals[key] += stats[key]
+        self.done[number] = end
+        while self.next_chunk in self.done:
+            self.offset = self.done.pop(self.next_chunk)
+            self.next_chunk += 1
+        save_checkpoint(self.path, {**self.identity, 'next_chunk': self.next_chunk, 'offset': self.offset,
+                                    'done': self.done, 'totals': self.totals})
+
+
+# ✅ Reading dumps
+
+def csv_header(path):
+    with open(path, newline='', encoding='utf-8') as source:
+        return next(csv.reader(source))
+
+
+def read_chunks(path, fmt, chunk_size, offset=0, first_chunk=0):
+    """Yields (chunk number, end offset, raw records) reading one record at a time.
+
+    Records stay undecoded bytes, parsing is left to the workers.
+    """
+    with open(path, 'rb') as source:
+        if fmt == 'csv':
+            source.readline()
+        source.seek(max(offset, source.tell()))
+        number, records = first_chunk, []
+        while True:
+            if fmt == 'bson':
+                # Every BSON document starts with its int32 length
+                size = source.read(4)
+                if not size:
+                    break
+                record = size + source.read(struct.unpack('<i', size)[0] - 4)
+            else:
+                record = source.readline()
+                if not record:
+                    break
+                if fmt == 'csv':
+                    # Quoted cells may contain newlines: read on until the quotes are balanced
+                    while record.count(b'"') % 2:
+                        line = source.readline()
+                        if not line:
+                            break
+                        record += line
+                if not record.strip():
+                    continue
+            records.append(record)
+            if len(records) == chunk_size:
+                yield number, source.tell(), records
+                number, records = number + 1, []
+        if records:
+            yield number, source.tell(), records
+
+
+def csv_document(header, row):
+    # Empty cells are fields the movie doesn't have
+    return {field: cell.split(CSV_LIST_SEPARATOR) if field in LIST_FIELDS else cell
+            for field, cell in zip(header, row) if cell != ''}
+
+
+def parse_records(fmt, records, header):
+    if fmt == 'csv':
+        for row in csv.reader(io.StringIO(b''.join(records).decode('utf-8'))):
+            yield csv_document(header, row)
+        return
+    decode = json_provider.loads if fmt == 'ndjson' else bson.decode
+    for record in records:
+        try:
+            yield decode(record)
+        except (ValueError, InvalidBSON):
+            # validate_movie() reports it as an invalid movie
+            yield None
+
+
+def load_chunk(fmt, records, header, upsert):
+    """Validates one chunk and writes it with a single unordered bulk_write (runs in a worker)."""
+    stats = {'written': 0, 'duplicates': 0, 'invalid': 0, 'failed': 0, 'errors': []}
+    ops = []
+    for document in parse_records(fmt, records, header):
+        try:
+            movie = validate_movie(document)
+        except CustomError as ce:
+            stats['invalid'] += 1
+            if len(stats['errors']) < MAX_ERROR_SAMPLES:
+                stats['errors'].append(str(ce))
+            continue
+        movie[VERSION_FIELD] = 1
+        with_search_fields(movie)
+        if upsert and '_id' in movie:
+            ops.append(ReplaceOne({'_id': movie['_id']}, movie, upsert=True))
+        else:
+            ops.append(InsertOne(movie))
+    if not ops:
+        return stats
+
+    try:
+        result = _pool.db['movies'].bulk_write(ops, ordered=False).bulk_api_result
+    except BulkWriteError as bwe:
+        result = bwe.details
+        for error in result['writeErrors']:
+            # Already imported (e.g. a chunk retried after --resume)
+            if error['code'] == DUPLICATE_KEY_ERROR:
+                stats['duplicates'] += 1
+                continue
+            stats['failed'] += 1
+            if len(stats['errors']) < MAX_ERROR_SAMPLES:
+                stats['errors'].append(error.get('errmsg'))
+    stats['written'] = result.get('nInserted', 0) + result.get('nUpserted', 0) + result.get('nModified', 0)
+    return stats
+
+
+def show_progress(done, total, count, started, label, final=False):
+    elapsed = max(time.monotonic() - started, 1e-9)
+    percent = f"{done / total * 100:5.1f}% " if total else ''
+    click.echo(f"\r{percent} {count:,} {label}  {count / elapsed:,.0f} docs/s  {elapsed:,.0f}s", nl=final, err=True)
+
+
+def finish_writes(config):
+    # Indexes are (re)built once after the load (--drop removes them); stats and leaderboards
+    # are derived from movies; running API workers see the change through their change watcher
+    db = MongoPool(config).db
+    ensure_indexes(db)
+    mark_stats_dirty(db)
+    invalidate_leaderboards(db)
+
+
+def import_catalogue(path, fmt, config, workers, chunk_size, processes, upsert, resume):
+    checkpoint_path = f"{path}.checkpoint.json"
+    identity = {'source': os.path.abspath(path), 'format': fmt, 'chunk_size': chunk_size}
+    saved = load_checkpoint(checkpoint_path, identity) if resume else None
+    checkpoint = ImportCheckpoint(checkpoint_path, identity, saved)
+    if saved:
+        click.echo(f"Resuming at chunk {checkpoint.next_chunk} ({checkpoint.totals['written']:,} written before)", err=True)
+
+    header = csv_header(path) if fmt == 'csv' else None
+    if processes:
+        executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(config,))
+    else:
+        # One pool (thread-safe) shared by every thread
+        _init_worker(config)
+        executor = ThreadPoolExecutor(workers)
+
+    total_bytes = os.path.getsize(path)
+    written_before = checkpoint.totals['written']
+    started = last_report = time.monotonic()
+    pending, errors = {}, []
+
+    def collect(futures):
+        nonlocal last_report
+        for future in futures:
+            number, end = pending.pop(future)
+            stats = future.result()
+            errors.extend(stats['errors'][:MAX_ERROR_SAMPLES - len(errors)])
+            checkpoint.complete(number, end, stats)
+            if time.monotonic() - last_report >= PROGRESS_INTERVAL_SECONDS:
+                last_report = time.monotonic()
+                show_progress(end, total_bytes, checkpoint.totals['written'] - written_before, started, 'written')
+
+    try:
+        for number, end, records in read_chunks(path, fmt, chunk_size, checkpoint.offset, checkpoint.next_chunk):
+            if number in checkpoint.done:
+                continue
+            # At most two chunks per worker are in memory at once
+            if len(pending) >= workers * 2:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                collect(finished)
+            pending[executor.submit(load_chunk, fmt, records, header, upsert)] = (number, end)
+        collect(wait(pending).done)
+    except KeyboardInterrupt:
+        # Chunks already running finish and are checkpointed, queued ones are left for --resume
+        executor.shutdown(wait=True, cancel_futures=True)
+        collect([future for future in list(pending) if not future.cancelled() and future.exception() is None])
+        click.echo(f"\nInterrupted, continue with: movies-catalogue import {path} --resume", err=True)
+        raise SystemExit(130)
+    finally:
+        executor.shutdown()
+        if checkpoint.totals['written'] > written_before:
+            finish_writes(config)
+
+    show_progress(total_bytes, total_bytes, checkpoint.totals['written'] - written_before, started, 'written', final=True)
+    totals = checkpoint.totals
+    click.echo(f"✅ {totals['written']:,} written, {totals['duplicates']:,} duplicates skipped, "
+               f"{totals['invalid']:,} invalid, {totals['failed']:,} failed", err=True)
+    for error in errors:
+        click.echo(f"❗ {error}", err=True)
+    # No chunk finished (e.g. an empty file): no checkpoint was ever written
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+
+# ✅ Writing dumps
+
+def csv_cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return CSV_LIST_SEPARATOR.join(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return str(value)
+
+
+def csv_bytes(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode('utf-8')
+
+
+def encode_documents(fmt, documents):
+    if fmt == 'ndjson':
+        return b''.join(json_provider.dumps_bytes(document) + b'\n' for document in documents)
+    if fmt == 'bson':
+        return b''.join(bson.encode(document) for document in documents)
+    return csv_bytes([csv_cell(document.get(field)) for field in CSV_COLUMNS] for document in documents)
+
+
+def export_catalogue(path, fmt, config, batch_size, resume):
+    checkpoint_path = f"{path}.checkpoint.json"
+    identity = {'target': os.path.abspath(path), 'format': fmt}
+    saved = load_checkpoint(checkpoint_path, identity) if resume else None
+    movies = MongoPool(config).db['movies']
+
+    # Export in _id order so a resumed export continues after the last written _id
+    query, exported = {}, 0
+    if saved:
+        query = {'_id': {'$gt': json_util.loads(saved['last_id'])}}
+        exported = saved['exported']
+        click.echo(f"Resuming after {exported:,} movies", err=True)
+    total = movies.estimated_document_count()
+
+    with open(path, 'r+b' if saved else 'wb') as out:
+        if saved:
+            # Drop anything written after the last checkpoint
+            out.truncate(saved['offset'])
+            out.seek(saved['offset'])
+        elif fmt == 'csv':
+            out.write(csv_bytes([CSV_COLUMNS]))
+
+        started, exported_before, batch = time.monotonic(), exported, []
+        cursor = movies.find(query, {SEARCH_FIELD: 0}, sort=[('_id', 1)], batch_size=batch_size)
+
+        def flush():
+            nonlocal exported
+            out.write(encode_documents(fmt, batch))
+            out.flush()
+            exported += len(batch)
+            save_checkpoint(checkpoint_path, {**identity, 'last_id': json_util.dumps(batch[-1]['_id']),
+                                              'offset': out.tell(), 'exported': exported})
+            show_progress(exported, total, exported - exported_before, started, 'exported')
+
+        try:
+            for movie in cursor:
+                batch.append(movie)
+                if len(batch) == batch_size:
+                    flush()
+                    batch = []
+            if batch:
+                flush()
+        except KeyboardInterrupt:
+            click.echo(f"\nInterrupted, continue with: movies-catalogue export {path} --resume", err=True)
+            raise SystemExit(130)
+        finally:
+            cursor.close()
+
+    show_progress(exported, total, exported - exported_before, started, 'exported', final=True)
+    click.echo(f"✅ {exported:,} movies exported to {path}", err=True)
+    if os.path.exists(checkpoint_path):
+        os.remove(checkpoint_path)
+
+
+# ✅ Console entry point: movies-catalogue (see setup.py)
+
+@click.group()
+@click.option('--uri', envvar='CONN_STR', default=Config.MONGO_URI, show_default=True, help='MongoDB connection string')
+@click.option('--db', 'db_name', envvar='MONGO_DB_NAME', default=Config.MONGO_DB_NAME, show_default=True)
+@click.pass_context
+def cli(ctx, uri, db_name):
+    """Import and export the movies catalogue."""
+    ctx.obj = mongo_config(uri, db_name)
+
+
+@cli.command('import')
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv', 'bson']), help='default: from the file extension')
+@click.option('--workers', default=os.cpu_count() or 4, show_default=True)
+@click.option('--chunk-size', default=5000, show_default=True, help='movies per bulk_write')
+@click.option('--processes', is_flag=True, help='validate in worker processes instead of threads (CPU-bound dumps)')
+@click.option('--upsert', is_flag=True, help='replace movies with the same _id instead of skipping them')
+@click.option('--drop', is_flag=True, help='drop the movies collection first')
+@click.option('--resume', is_flag=True, help='continue from the checkpoint of an interrupted import')
+@click.pass_obj
+def import_command(config, path, fmt, workers, chunk_size, processes, upsert, drop, resume):
+    """Load a movies dump with parallel unordered bulk writes."""
+    if drop and not resume:
+        MongoPool(config).db['movies'].drop()
+    import_catalogue(path, dump_format(path, fmt), config, workers, chunk_size, processes, upsert, resume)
+
+
+@cli.command('export')
+@click.argument('path', type=click.Path(dir_okay=False))
+@click.option('--format', 'fmt', type=click.Choice(['ndjson', 'csv', 'bson']), help='default: from the file extension')
+@click.option('--batch-size', default=5000, show_default=True, help='movies per write and checkpoint')
+@click.option('--resume', is_flag=True, help='continue an interrupted export')
+@click.pass_obj
+def export_command(config, path, fmt, batch_size, resume):
+    """Stream the movies collection to a dump file."""
+    export_catalogue(path, dump_format(path, fmt), config, batch_size, resume)
+
+
+if __name__ == "__main__":
+    cli()
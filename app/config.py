@@ -0,0 +1,95 @@
+import os
+from dotenv import load_dotenv
+
+# ✅ Load environment variables
+load_dotenv()
+
+
+class Config:
+    # ✅ MongoDB connection
+    MONGO_URI = os.getenv('CONN_STR', 'mongodb://localhost:27017/movies_db')
+    MONGO_DB_NAME = os.getenv('MONGO_DB_NAME', 'my-db')
+
+    # ✅ MongoDB connection pool (one pool per worker process)
+    MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 50))
+    MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+    MONGO_MAX_IDLE_TIME_MS = int(os.getenv('MONGO_MAX_IDLE_TIME_MS', 60000))
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 5000))
+
+    # Callable used to build the client, e.g. mongomock.MongoClient in benchmarks
+    MONGO_CLIENT_FACTORY = None
+
+    # ✅ Indexes: create the declared movie indexes at startup
+    MONGO_CREATE_INDEXES = os.getenv('MONGO_CREATE_INDEXES', 'true').lower() == 'true'
+    # 'off' accepts any field, 'reject' answers 400, 'downgrade' ignores unindexed filter/sort fields
+    QUERY_INDEX_MODE = os.getenv('QUERY_INDEX_MODE', 'off')
+    # ✅ Aggregation policies: maxTimeMS for paged reads (0 = none, streamed exports never get one)
+    # and allowDiskUse: 'auto' (only for sorts without a $limit), 'always' or 'never'
+    QUERY_MAX_TIME_MS = int(os.getenv('QUERY_MAX_TIME_MS', 10000))
+    QUERY_ALLOW_DISK_USE = os.getenv('QUERY_ALLOW_DISK_USE', 'auto')
+    # Adds X-Query-Pipeline / X-Query-Options (the pipeline MongoDB ran) to responses
+    QUERY_DEBUG_HEADERS = os.getenv('QUERY_DEBUG_HEADERS', 'false').lower() == 'true'
+
+    # ✅ Response cache for movie reads ('memory' per worker or shared 'redis')
+    CACHE_ENABLED = os.getenv('CACHE_ENABLED', 'true').lower() == 'true'
+    CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'memory')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_TTL_SECONDS = int(os.getenv('CACHE_TTL_SECONDS', 60))
+    CACHE_MAX_ENTRIES = int(os.getenv('CACHE_MAX_ENTRIES', 1024))
+    CACHE_MAX_BYTES = int(os.getenv('CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+    # ✅ Single-flight: identical concurrent reads in a worker share one DB call
+    COALESCE_ENABLED = os.getenv('COALESCE_ENABLED', 'true').lower() == 'true'
+    COALESCE_MAX_WAIT_MS = int(os.getenv('COALESCE_MAX_WAIT_MS', 2000))
+
+    # ✅ Response compression by Accept-Encoding (br/zstd need the brotli/zstandard packages)
+    COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() == 'true'
+    COMPRESSION_ALGORITHMS = os.getenv('COMPRESSION_ALGORITHMS', 'zstd,br,gzip')
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_LEVEL = int(os.getenv('COMPRESSION_BROTLI_LEVEL', 5))
+    COMPRESSION_ZSTD_LEVEL = int(os.getenv('COMPRESSION_ZSTD_LEVEL', 3))
+
+    # ✅ Invalidate caches on writes from any worker/node/script (change streams, else polling)
+    CHANGE_WATCH_ENABLED = os.getenv('CHANGE_WATCH_ENABLED', 'true').lower() == 'true'
+    CHANGE_POLL_INTERVAL_SECONDS = float(os.getenv('CHANGE_POLL_INTERVAL_SECONDS', 2))
+
+    # ✅ ?total=estimate caches filtered counts this long (they may lag behind writes)
+    COUNT_CACHE_TTL_SECONDS = int(os.getenv('COUNT_CACHE_TTL_SECONDS', 30))
+
+    # ✅ Admission control: token bucket per client (API key or IP) and in-flight cap per worker
+    # 'memory' (per worker) or 'redis' (shared by every worker and node)
+    RATE_LIMIT_ENABLED = os.getenv('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+    RATE_LIMIT_BACKEND = os.getenv('RATE_LIMIT_BACKEND', 'memory')
+    RATE_LIMIT_REDIS_URL = os.getenv('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATE_LIMIT_PER_SECOND = float(os.getenv('RATE_LIMIT_PER_SECOND', 20))
+    RATE_LIMIT_BURST = int(os.getenv('RATE_LIMIT_BURST', 100))
+    # {endpoint: tokens}, overrides app/Utils/rate_limit.py ROUTE_COSTS
+    RATE_LIMIT_ROUTE_COSTS = {}
+    # Keep it at or below MONGO_MAX_POOL_SIZE so requests are shed before they queue for a connection (0 = off)
+    MAX_IN_FLIGHT_REQUESTS = int(os.getenv('MAX_IN_FLIGHT_REQUESTS', MONGO_MAX_POOL_SIZE))
+    IN_FLIGHT_WAIT_MS = int(os.getenv('IN_FLIGHT_WAIT_MS', 50))
+    # Reverse proxies in front of the app (nginx, a load balancer...) whose X-Forwarded-* headers
+    # are trusted, so clients are told apart by their own IP (0 = use the connecting address)
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
+    # Larger ?limit= values are capped to this
+    MAX_PAGE_LIMIT = int(os.getenv('MAX_PAGE_LIMIT', 1000))
+
+    # ✅ Request body and bulk endpoint limits
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 32 * 1024 * 1024))
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 50000))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 1000))
+
+    # ✅ Streaming NDJSON export (?stream=1 or Accept: application/x-ndjson)
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', 500))
+
+    # ✅ Materialized movie stats are rebuilt on read once they are older than this
+    STATS_MAX_STALENESS_SECONDS = int(os.getenv('STATS_MAX_STALENESS_SECONDS', 300))
+
+    # ✅ Stored /highest-rated leaderboards are rebuilt at least this often (0 = only after API writes)
+    LEADERBOARD_MAX_AGE_SECONDS = int(os.getenv('LEADERBOARD_MAX_AGE_SECONDS', 300))
+
+    # ✅ Metrics: Prometheus /metrics (needs prometheus_client) and slow-request log (0 = off)
+    METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'true').lower() == 'true'
+    SLOW_REQUEST_MS = int(os.getenv('SLOW_REQUEST_MS', 0))
@@ -0,0 +1,189 @@
+from pymongo import ReturnDocument
+from quart import current_app, jsonify, request
+from bson.objectid import ObjectId
+from app.Utils.custom_error import CustomError
+from app.Utils.api_features import TOTAL_FACET, TOTAL_MODES, AsyncApiFeatures
+from app.Models.movie_model import DEFAULT_LIST_VIEW, VERSION_FIELD
+from app.Models.movie_leaderboard import LEADERBOARD_FIELDS, TOP_SORT_WITH_ID, invalidate_leaderboards
+from app.Models.movie_search import PREFIX_SOURCE_FIELDS, search_fields_for_update, with_search_fields
+from app.Models.movie_stats import mark_stats_dirty
+from app.controllers.movie_controller import (BROWSE_FACETS, MovieController, document_projection, facet_rows,
+                                              if_match_versions, patch_filter, version_etag)
+from app.db.async_db import get_async_db
+
+
+class AsyncMovieController(MovieController):
+    """Async versions of the MovieController handlers, served by app/asgi.py.
+
+    Every database call is awaited on Motor, so one process keeps many
+    requests in flight instead of blocking a worker per query.
+    """
+
+    @property
+    def movies_collection(self):
+        try:
+            return get_async_db()['movies']
+        except Exception as e:
+            raise CustomError(f"Error connecting to the database: {str(e)}", 500)
+
+    def api_features(self, query_params, index_mode=None):
+        if index_mode is None:
+            index_mode = current_app.config['QUERY_INDEX_MODE']
+        return AsyncApiFeatures(self.movies_collection, query_params, index_mode=index_mode,
+                                max_limit=current_app.config['MAX_PAGE_LIMIT'],
+                                max_time_ms=current_app.config['QUERY_MAX_TIME_MS'],
+                                allow_disk_use=current_app.config['QUERY_ALLOW_DISK_USE'])
+
+    async def after_write(self, movie_id=None, fields=None):
+        # Stored leaderboards are simply rebuilt by the next sync read
+        await mark_stats_dirty(get_async_db())
+        if fields is None or LEADERBOARD_FIELDS & set(fields):
+            await invalidate_leaderboards(get_async_db())
+
+    async def _list_response(self, api_features, error_message, facets=None, with_total=False):
+        try:
+            mode = request.args.get('total') if with_total else None
+            if mode is not None and mode not in TOTAL_MODES:
+                raise CustomError(f"Unknown total mode '{mode}', use one of: {', '.join(TOTAL_MODES)}", 400)
+            if mode == 'exact':
+                facets = {**(facets or {}), **TOTAL_FACET}
+
+            movies = await api_features.paginate().facet(facets).execute()
+            response = {
+                "status": "success",
+                "count": len(movies),
+                "data": movies
+            }
+            if mode == 'exact':
+                response["total"] = api_features.exact_total()
+            elif mode == 'estimate':
+                response["total"] = await api_features.estimated_total(ttl=current_app.config['COUNT_CACHE_TTL_SECONDS'])
+            if api_features.is_cursor_mode:
+                response["next"] = api_features.next_cursor
+            if any(name in api_features.facet_results for name in BROWSE_FACETS):
+                response["facets"] = facet_rows(api_features.facet_results)
+            return jsonify(response), 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"{error_message}: {str(e)}"}), 500
+
+    async def get_all_movies(self):
+        try:
+            api_features = self.api_features(request.args).filter().sort().limit_fields(DEFAULT_LIST_VIEW)
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        return await self._list_response(api_features, "Error fetching movies", with_total=True)
+
+    async def get_highest_rated(self):
+        try:
+            api_features = self.api_features(request.args).filter().sort(default=TOP_SORT_WITH_ID).limit_fields(DEFAULT_LIST_VIEW)
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        return await self._list_response(api_features, "Error fetching highest rated movies")
+
+    async def get_movies_by_genre(self, genre):
+        try:
+            api_features = (self.api_features(request.args)
+                            .filter()
+                            .match({'genres': genre})
+                            .sort()
+                            .limit_fields(DEFAULT_LIST_VIEW))
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        facets = BROWSE_FACETS if request.args.get('facets', '').lower() in ['1', 'true'] else None
+        return await self._list_response(api_features, "Error fetching movies by genre", facets, with_total=True)
+
+    async def get_single_movie(self, movie_id):
+        try:
+            projection = document_projection(request.args)
+            movie = await self.movies_collection.find_one({"_id": ObjectId(movie_id)}, projection)
+            if not movie:
+                raise CustomError("Movie not found", 404)
+
+            response = {
+                "status": "success",
+                "count": 1,
+                "data": movie
+            }
+            response = jsonify(response)
+            response.set_etag(version_etag(movie, await response.get_data()))
+            return response, 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error fetching movie: {str(e)}"}), 500
+
+    async def create_movie(self):
+        try:
+            data = self.validate_body(await request.get_json())
+            data[VERSION_FIELD] = 1
+            # A copy is stored, so the internal search field stays out of the response
+            result = await self.movies_collection.insert_one(with_search_fields(dict(data)))
+            data['_id'] = result.inserted_id
+            await self.after_write()
+
+            response = {
+                "status": "success",
+                "count": 1,
+                "data": data
+            }
+            return jsonify(response), 201
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error creating movie: {str(e)}"}), 500
+
+    async def update_movie(self, movie_id):
+        try:
+            movie_id = self._object_id(movie_id)
+            data = self.patch_body(await request.get_json())
+            versions = if_match_versions(request.if_match)
+            projection = document_projection(request.args)
+            changes = dict(data)
+            if any(field in data for field in PREFIX_SOURCE_FIELDS):
+                current = await self.movies_collection.find_one({"_id": movie_id}, {field: 1 for field in PREFIX_SOURCE_FIELDS})
+                changes.update(search_fields_for_update(current, data))
+
+            movie = await self.movies_collection.find_one_and_update(
+                patch_filter(movie_id, data, versions),
+                {"$set": changes, "$inc": {VERSION_FIELD: 1}},
+                projection=projection,
+                return_document=ReturnDocument.AFTER
+            )
+            modified = movie is not None
+            if modified:
+                await self.after_write(movie_id, changes)
+            else:
+                movie = await self.movies_collection.find_one({"_id": movie_id}, projection)
+                if not movie:
+                    raise CustomError("Movie not found", 404)
+                if versions is not None and movie.get(VERSION_FIELD, 0) not in versions:
+                    raise CustomError("Movie was changed by another request, fetch it and retry", 412)
+
+            response = {
+                "status": "success",
+                "count": 1,
+                "modified": modified,
+                "data": movie
+            }
+            response = jsonify(response)
+            response.set_etag(version_etag(movie, await response.get_data()))
+            return response, 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error updating movie: {str(e)}"}), 500
+
+    async def delete_movie(self, movie_id):
+        try:
+            result = await self.movies_collection.delete_one({"_id": ObjectId(movie_id)})
+            if result.deleted_count == 0:
+                raise CustomError("Movie not found", 404)
+            await self.after_write()
+
+            return jsonify({"status": "success", "data": None}), 204
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error deleting movie: {str(e)}"}), 500
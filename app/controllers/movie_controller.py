@@ -1,100 +1,235 @@
-from flask import jsonify, request
-from pymongo import MongoClient
+import re
+from flask import Response, current_app, jsonify, request, stream_with_context
+from bson.errors import InvalidId
 from bson.objectid import ObjectId
+from pymongo import DeleteOne, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError
+from werkzeug.exceptions import BadRequest, RequestEntityTooLarge
 from app.Utils.custom_error import CustomError
-from app.Utils.api_features import ApiFeatures
-from dotenv import load_dotenv
-import os
+from app.Utils.api_features import TOTAL_FACET, TOTAL_MODES, ApiFeatures, page_limit, page_number
+from app.Utils.response_cache import cached_response, get_cache, invalidate_cache, make_etag
+from app.Models.movie_model import DEFAULT_LIST_VIEW, VERSION_FIELD, validate_movie
+from app.Models.movie_leaderboard import (LEADERBOARD_FIELDS, LEADERBOARD_SIZE, SCOPE_FIELDS, TOP_SORT_WITH_ID,
+                                          get_leaderboard, invalidate_leaderboards, refresh_movie_leaderboards)
+from app.Models.movie_search import (PREFIX_SOURCE_FIELDS, prefix_query, search_fields_for_update,
+                                     text_query, with_search_fields)
+from app.Models.movie_stats import BREAKDOWNS, get_stats, mark_stats_dirty
+from app.db.db import get_db
+from app.db.indexes import explain_pipeline, is_filter_supported, is_sort_supported
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# A single movie's ETag: "v<version>-<content hash>"; If-Match may also name just "v<version>"
+VERSION_TAG = re.compile(r'^v(\d+)(?:-|$)')
+
+# ✅ Browse counts returned by ?facets=1 (computed over the same $match as the page)
+BROWSE_FACETS = {
+    'genres': [
+        {'$unwind': '$genres'},
+        {'$group': {'_id': '$genres', 'count': {'$sum': 1}}},
+        {'$sort': {'count': -1, '_id': 1}}
+    ],
+    'release_years': [
+        {'$group': {'_id': '$release_year', 'count': {'$sum': 1}}},
+        {'$sort': {'_id': -1}}
+    ],
+}
+
+
+def wants_facets():
+    return request.args.get('facets', '').lower() in ['1', 'true']
+
+
+def facet_rows(facet_results):
+    return {name: [{"key": row["_id"], "count": row["count"]} for row in facet_results.get(name, [])] for name in BROWSE_FACETS}
+
+
+def total_mode():
+    mode = request.args.get('total')
+    if mode is not None and mode not in TOTAL_MODES:
+        raise CustomError(f"Unknown total mode '{mode}', use one of: {', '.join(TOTAL_MODES)}", 400)
+    return mode
+
+
+def if_match_versions(if_match):
+    """Versions named by If-Match ("v3-<hash>" or just "v3"), or None when the header is absent or '*'."""
+    if not if_match or if_match.star_tag:
+        return None
+    # Compressed responses carry the weak form (W/"v3-...") of the same version
+    tags = (VERSION_TAG.match(tag) for tag in if_match.as_set(include_weak=True))
+    return [int(tag.group(1)) for tag in tags if tag]
+
+
+def version_etag(movie, body):
+    # The version is for If-Match; the content hash changes even when a write made outside
+    # the API didn't bump the version, so If-None-Match never gets a 304 for changed data
+    return f"v{movie.get(VERSION_FIELD, 0)}-{make_etag(body)}"
+
+
+def document_projection(query_params):
+    # The version is always returned, it is the document's ETag
+    projection = ApiFeatures.projection(query_params)
+    if any(projection.values()):
+        projection[VERSION_FIELD] = 1
+    return projection
+
+
+def patch_filter(movie_id, data, versions=None):
+    """Matches the movie only if the If-Match version fits and the patch changes something."""
+    query = {"_id": movie_id}
+    if versions is not None:
+        # Movies written before versioning have no version field, i.e. version 0
+        query[VERSION_FIELD] = {"$in": (versions + [None]) if 0 in versions else versions}
+    query["$or"] = [{field: {"$ne": value}} for field, value in data.items()]
+    return query
+
+
+def wants_stream():
+    if request.args.get('stream', '').lower() in ['1', 'true']:
+        return True
+    return request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE]) == NDJSON_MIMETYPE
 
-# Load environment variables
-load_dotenv()
 
 class MovieController:
-    def __init__(self):
+    @property
+    def movies_collection(self):
+        # Use the app's shared connection pool instead of opening a client per controller
         try:
-            # Connect to MongoDB
-            conn_str = os.getenv('CONN_STR')
-            if not conn_str:
-                raise ValueError("❗ Connection string not found in environment variables.")
-            
-            client = MongoClient(conn_str)
-            db = client['my-db']
-            self.movies_collection = db['movies']
+            return get_db()['movies']
         except Exception as e:
             raise CustomError(f"Error connecting to the database: {str(e)}", 500)
 
+    def api_features(self, query_params, index_mode=None):
+        if index_mode is None:
+            index_mode = current_app.config['QUERY_INDEX_MODE']
+        return ApiFeatures(self.movies_collection, query_params, index_mode=index_mode,
+                           max_limit=current_app.config['MAX_PAGE_LIMIT'],
+                           max_time_ms=current_app.config['QUERY_MAX_TIME_MS'],
+                           allow_disk_use=current_app.config['QUERY_ALLOW_DISK_USE'])
+
+    def after_write(self, movie_id=None, fields=None):
+        # Keep everything derived from the movies collection in step with writes
+        invalidate_cache('movies')
+        mark_stats_dirty(get_db())
+        if fields is None:
+            invalidate_leaderboards(get_db())
+        elif LEADERBOARD_FIELDS & set(fields):
+            # A single movie's rating (or listed fields) changed: rebuild its leaderboards now
+            refresh_movie_leaderboards(get_db(), movie_id)
+
+    def from_leaderboard(self, query_params, scope):
+        # The stored leaderboards cover the default view, scope equality filters and the top LEADERBOARD_SIZE
+        if any(key in query_params for key in ['sort', 'fields', 'cursor']):
+            return False
+        if query_params.get('view', DEFAULT_LIST_VIEW) != DEFAULT_LIST_VIEW:
+            return False
+        if not set(scope) <= SCOPE_FIELDS or any(isinstance(value, dict) for value in scope.values()):
+            return False
+        limit = page_limit(query_params, current_app.config['MAX_PAGE_LIMIT'])
+        page = page_number(query_params)
+        return page * limit <= LEADERBOARD_SIZE
+
+    def total(self, api_features, mode):
+        if mode == 'exact':
+            return api_features.exact_total()
+        return api_features.estimated_total(get_cache(), current_app.config['COUNT_CACHE_TTL_SECONDS'])
+
     def validate_body(self, data):
-        if not data.get('title') or not data.get('release_year'):
-            raise CustomError("Not a valid movie object", 400)
+        # Same schema as the Movie model: returns the coerced document to insert
+        return validate_movie(data)
 
+    def patch_body(self, data):
+        # _id and the version are managed by the server
+        data = validate_movie(data, partial=True)
+        if not data:
+            raise CustomError("Nothing to update", 400)
+        return data
+
+    @cached_response('movies', unless=wants_stream)
     def get_all_movies(self):
         try:
             # Extract query parameters from the request
             query_params = request.args
 
             # Initialize ApiFeatures with the collection and query parameters
-            api_features = ApiFeatures(self.movies_collection, query_params)
+            api_features = self.api_features(query_params)
+
+            if wants_stream():
+                return self.stream_movies(api_features)
 
             # Apply filtering, sorting, pagination, and field selection
+            mode = total_mode()
             movies = (api_features
                       .filter()
                       .sort()
-                      .limit_fields()
+                      .limit_fields(DEFAULT_LIST_VIEW)
                       .paginate()
+                      .facet(TOTAL_FACET if mode == 'exact' else None)
                       .execute())
 
-            # Convert _id to string for all movies
-            for movie in movies:
-                movie['_id'] = str(movie['_id'])
-
             response = {
                 "status": "success",
                 "count": len(movies),
                 "data": movies
             }
+            if mode:
+                response["total"] = self.total(api_features, mode)
+            if api_features.is_cursor_mode:
+                response["next"] = api_features.next_cursor
             return jsonify(response), 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
         except Exception as e:
             return jsonify({"status": "fail", "message": f"Error fetching movies: {str(e)}"}), 500
 
+    @cached_response('movies')
     def get_highest_rated(self):
         try:
-            # Similar to get_all_movies but we apply sorting by ratings
+            # Top-N by ratings (total_rating breaks ties), optionally ?genres= and/or ?release_year=
             query_params = request.args
-            api_features = ApiFeatures(self.movies_collection, query_params)
-
-            # Apply filtering and sorting
-            movies = (api_features
-                      .sort()  # Sorting by ratings is part of the sort method
-                      .limit_fields()
-                      .paginate()
-                      .execute())
-
-            # Convert _id to string for all movies
-            for movie in movies:
-                movie['_id'] = str(movie['_id'])
+            api_features = self.api_features(query_params).filter()
+            scope = api_features.pipeline[0]['$match']
+
+            if self.from_leaderboard(query_params, scope):
+                limit = page_limit(query_params, current_app.config['MAX_PAGE_LIMIT'])
+                skip = (page_number(query_params) - 1) * limit
+                movies = get_leaderboard(get_db(), scope, skip, limit, current_app.config['LEADERBOARD_MAX_AGE_SECONDS'])
+            else:
+                # Bounded $sort + $limit on the (scope, ratings, total_rating) indexes
+                movies = (api_features
+                          .sort(default=TOP_SORT_WITH_ID)
+                          .limit_fields(DEFAULT_LIST_VIEW)
+                          .paginate()
+                          .execute())
 
             response = {
                 "status": "success",
                 "count": len(movies),
                 "data": movies
             }
+            if api_features.is_cursor_mode:
+                response["next"] = api_features.next_cursor
             return jsonify(response), 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
         except Exception as e:
             return jsonify({"status": "fail", "message": f"Error fetching highest rated movies: {str(e)}"}), 500
 
+    @cached_response('movies')
     def get_single_movie(self, movie_id):
         try:
-            movie = self.movies_collection.find_one({"_id": ObjectId(movie_id)})
+            projection = document_projection(request.args)
+            movie = self.movies_collection.find_one({"_id": ObjectId(movie_id)}, projection)
             if not movie:
                 raise CustomError("Movie not found", 404)
 
-            movie['_id'] = str(movie['_id'])
             response = {
                 "status": "success",
                 "count": 1,  # Single item, count is 1
                 "data": movie
             }
-            return jsonify(response), 200
+            response = jsonify(response)
+            response.set_etag(version_etag(movie, response.get_data()))
+            return response, 200
         except CustomError as ce:
             return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
         except Exception as e:
@@ -102,10 +237,12 @@ class MovieController:
 
     def create_movie(self):
         try:
-            data = request.get_json()
-            self.validate_body(data)
-            result = self.movies_collection.insert_one(data)
-            data['_id'] = str(result.inserted_id)
+            data = self.validate_body(request.get_json())
+            data[VERSION_FIELD] = 1
+            # A copy is stored, so the internal search field stays out of the response
+            result = self.movies_collection.insert_one(with_search_fields(dict(data)))
+            data['_id'] = result.inserted_id
+            self.after_write()
 
             response = {
                 "status": "success",
@@ -113,22 +250,47 @@ class MovieController:
                 "data": data
             }
             return jsonify(response), 201
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
         except Exception as e:
             return jsonify({"status": "fail", "message": f"Error creating movie: {str(e)}"}), 500
 
     def update_movie(self, movie_id):
         try:
-            data = request.get_json()
-            result = self.movies_collection.update_one({"_id": ObjectId(movie_id)}, {"$set": data})
-            if result.matched_count == 0:
-                raise CustomError("Movie not found", 404)
+            movie_id = self._object_id(movie_id)
+            data = self.patch_body(request.get_json())
+            versions = if_match_versions(request.if_match)
+            projection = document_projection(request.args)
+            changes = {**data, **self.search_fields_for_update(movie_id, data)}
+
+            # One round trip: writes only when the version matches and a value differs,
+            # and returns the updated document so clients don't need to GET it again
+            movie = self.movies_collection.find_one_and_update(
+                patch_filter(movie_id, data, versions),
+                {"$set": changes, "$inc": {VERSION_FIELD: 1}},
+                projection=projection,
+                return_document=ReturnDocument.AFTER
+            )
+            modified = movie is not None
+            if modified:
+                self.after_write(movie_id, changes)
+            else:
+                # Nothing written: missing movie, stale If-Match, or a patch that changes nothing
+                movie = self.movies_collection.find_one({"_id": movie_id}, projection)
+                if not movie:
+                    raise CustomError("Movie not found", 404)
+                if versions is not None and movie.get(VERSION_FIELD, 0) not in versions:
+                    raise CustomError("Movie was changed by another request, fetch it and retry", 412)
 
             response = {
                 "status": "success",
                 "count": 1,  # One movie updated
-                "data": data
+                "modified": modified,
+                "data": movie
             }
-            return jsonify(response), 200
+            response = jsonify(response)
+            response.set_etag(version_etag(movie, response.get_data()))
+            return response, 200
         except CustomError as ce:
             return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
         except Exception as e:
@@ -139,6 +301,7 @@ class MovieController:
             result = self.movies_collection.delete_one({"_id": ObjectId(movie_id)})
             if result.deleted_count == 0:
                 raise CustomError("Movie not found", 404)
+            self.after_write()
 
             return jsonify({"status": "success", "data": None}), 204  # No Content
         except CustomError as ce:
@@ -146,32 +309,301 @@ class MovieController:
         except Exception as e:
             return jsonify({"status": "fail", "message": f"Error deleting movie: {str(e)}"}), 500
 
+    @cached_response('movies')
     def get_movies_by_genre(self, genre):
         try:
             # Use ApiFeatures for genre-based search with query parameters
             query_params = request.args
-            api_features = ApiFeatures(self.movies_collection, query_params)
+            api_features = self.api_features(query_params)
 
-            # Apply filtering (by genre) and other features
+            # The genre goes into the leading $match so the multikey genres index is used
+            mode = total_mode()
+            facets = {**(BROWSE_FACETS if wants_facets() else {}), **(TOTAL_FACET if mode == 'exact' else {})}
             movies = (api_features
                       .filter()
+                      .match({'genres': genre})
                       .sort()
-                      .limit_fields()
+                      .limit_fields(DEFAULT_LIST_VIEW)
                       .paginate()
+                      .facet(facets)
                       .execute())
 
-            for movie in movies:
-                movie['_id'] = str(movie['_id'])
-
             response = {
                 "status": "success",
                 "count": len(movies),  # Include count
                 "data": movies
             }
+            if mode:
+                response["total"] = self.total(api_features, mode)
+            if api_features.is_cursor_mode:
+                response["next"] = api_features.next_cursor
+            if wants_facets():
+                response["facets"] = facet_rows(api_features.facet_results)
             return jsonify(response), 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
         except Exception as e:
             return jsonify({"status": "fail", "message": f"Error fetching movies by genre: {str(e)}"}), 500
 
+    @cached_response('movies')
+    def search_movies(self):
+        try:
+            q = request.args.get('q', '').strip()
+            mode = request.args.get('mode', 'text')
+            if not q:
+                raise CustomError("Missing search query, use ?q=", 400)
+            if mode not in ['text', 'prefix']:
+                raise CustomError(f"Unknown search mode '{mode}', use one of: text, prefix", 400)
+
+            api_features = self.api_features(request.args)
+            if api_features.is_cursor_mode:
+                # Relevance scores are not stable sort keys, so search pages by ?page=
+                raise CustomError("Cursor pagination is not supported for search, use ?page=", 400)
+
+            api_features.filter()
+            if mode == 'text':
+                # Weighted $text search, best matches first
+                score = {'score': {'$meta': 'textScore'}}
+                api_features.match(text_query(q)).sort(default=list(score.items())).limit_fields(DEFAULT_LIST_VIEW, extra=score)
+            else:
+                # Autocomplete: every typed word is a prefix of a title word
+                api_features.match(prefix_query(q)).sort(default=[('ratings', -1)]).limit_fields(DEFAULT_LIST_VIEW)
+
+            movies = api_features.paginate().execute()
+            response = {
+                "status": "success",
+                "count": len(movies),
+                "data": movies
+            }
+            return jsonify(response), 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error searching movies: {str(e)}"}), 500
+
+    def search_fields_for_update(self, movie_id, data):
+        # Renames need the other title field to rebuild the prefixes, so read it first
+        if not any(field in data for field in PREFIX_SOURCE_FIELDS):
+            return {}
+        current = self.movies_collection.find_one({"_id": movie_id}, {field: 1 for field in PREFIX_SOURCE_FIELDS})
+        return search_fields_for_update(current, data)
+
+    def stream_movies(self, api_features):
+        # Full exports return whole documents and skip pagination unless asked for
+        api_features.filter().sort().limit_fields('full')
+        if any(key in request.args for key in ['limit', 'page', 'cursor']):
+            api_features.paginate()
+
+        if api_features.is_cursor_mode:
+            # A cursor page is bounded by ?limit: read it (plus the lookahead row) first, so the
+            # extra row is dropped and the next token can go in a header before the body
+            movies = api_features.execute()
+            body = ''.join(current_app.json.dumps(movie) + '\n' for movie in movies)
+            response = Response(body, mimetype=NDJSON_MIMETYPE)
+            if api_features.next_cursor:
+                response.headers['X-Next-Cursor'] = api_features.next_cursor
+            return response
+
+        cursor = api_features.stream(current_app.config['STREAM_BATCH_SIZE'])
+
+        def generate():
+            try:
+                for movie in cursor:
+                    yield current_app.json.dumps(movie) + '\n'
+            finally:
+                cursor.close()
+
+        return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
+
+    def get_movie_stats(self):
+        try:
+            by = request.args.get('by')
+            breakdowns = by.split(',') if by else list(BREAKDOWNS)
+            unknown = [kind for kind in breakdowns if kind not in BREAKDOWNS]
+            if unknown:
+                raise CustomError(f"Unknown stats breakdown '{unknown[0]}', use one of: {', '.join(BREAKDOWNS)}", 400)
+
+            data, staleness = get_stats(
+                get_db(),
+                current_app.config['STATS_MAX_STALENESS_SECONDS'],
+                breakdowns,
+                page_limit(request.args, current_app.config['MAX_PAGE_LIMIT'])
+            )
+            response = {
+                "status": "success",
+                "staleness": staleness,
+                "data": data
+            }
+            return jsonify(response), 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error fetching movie stats: {str(e)}"}), 500
+
+    def explain_query(self, query_params):
+        # Build the same pipeline as get_all_movies, but never reject fields here
+        api_features = (self.api_features(query_params, index_mode='off')
+                        .filter()
+                        .sort()
+                        .limit_fields(DEFAULT_LIST_VIEW)
+                        .paginate())
+
+        pipeline = api_features.build()
+        report = explain_pipeline(get_db(), pipeline)
+        report["unindexed_filters"] = [field for field in api_features.pipeline[0]['$match'] if not is_filter_supported(field)]
+        report["sort_indexed"] = is_sort_supported(api_features.sort_fields, api_features.equality_fields)
+        report["pipeline"] = pipeline
+        return report
+
+    def explain_movies(self):
+        try:
+            response = {
+                "status": "success",
+                "data": self.explain_query(request.args)
+            }
+            return jsonify(response), 200
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce)}), ce.status_code
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error explaining query: {str(e)}"}), 500
+
+    # ✅ Bulk endpoints: JSON array or NDJSON body, written with bulk_write
+
+    def bulk_create_movies(self):
+        def build_op(item):
+            item = self.validate_body(item)
+            item[VERSION_FIELD] = 1
+            return InsertOne(with_search_fields(item))
+        return self._bulk_write(build_op, 201)
+
+    def bulk_update_movies(self):
+        def build_op(item):
+            fields = self.patch_body(item)
+            movie_id = self._object_id(item.get('_id'))
+            fields.update(self.search_fields_for_update(movie_id, fields))
+            return UpdateOne({"_id": movie_id}, {"$set": fields, "$inc": {VERSION_FIELD: 1}})
+        return self._bulk_write(build_op, 200)
+
+    def bulk_delete_movies(self):
+        def build_op(item):
+            movie_id = item.get('_id') if isinstance(item, dict) else item
+            return DeleteOne({"_id": self._object_id(movie_id)})
+        return self._bulk_write(build_op, 200)
+
+    @staticmethod
+    def _object_id(movie_id):
+        try:
+            return ObjectId(movie_id)
+        except (InvalidId, TypeError):
+            raise CustomError(f"Invalid movie id: {movie_id}", 400)
+
+    def _bulk_items(self):
+        """Yields (index, item); NDJSON is read line by line so memory stays bounded."""
+        if request.mimetype == 'application/x-ndjson':
+            index = 0
+            for line in request.stream:
+                if not line.strip():
+                    continue
+                try:
+                    yield index, current_app.json.loads(line)
+                except ValueError:
+                    yield index, CustomError("Invalid JSON", 400)
+                index += 1
+            return
+
+        try:
+            # DELETE bodies skip the JSON middleware, so malformed JSON surfaces here
+            items = request.get_json()
+        except BadRequest:
+            raise CustomError("Invalid JSON", 400)
+        if not isinstance(items, list):
+            raise CustomError("Expected a JSON array or an NDJSON body", 400)
+        if len(items) > current_app.config['BULK_MAX_ITEMS']:
+            raise CustomError(f"Batch is limited to {current_app.config['BULK_MAX_ITEMS']} items", 413)
+        yield from enumerate(items)
+
+    def _flush_bulk(self, ops, indexes, ordered, totals, errors):
+        try:
+            details = self.movies_collection.bulk_write(ops, ordered=ordered).bulk_api_result
+        except BulkWriteError as bwe:
+            details = bwe.details
+            for error in details.get('writeErrors', []):
+                # error['index'] is relative to this chunk
+                errors.append({"index": indexes[error['index']], "message": error.get('errmsg')})
+
+        for key in totals:
+            totals[key] += details.get(key, 0)
+        return not details.get('writeErrors')
+
+    @staticmethod
+    def _bulk_counts(totals):
+        return {
+            "inserted": totals['nInserted'],
+            "matched": totals['nMatched'],
+            "modified": totals['nModified'],
+            "deleted": totals['nRemoved'],
+        }
+
+    def _bulk_write(self, build_op, success_code):
+        # Chunks are written while the body is read, so a failure can come after some writes
+        totals = {'nInserted': 0, 'nMatched': 0, 'nModified': 0, 'nRemoved': 0}
+        try:
+            ordered = request.args.get('ordered', 'true').lower() != 'false'
+            max_items = current_app.config['BULK_MAX_ITEMS']
+            chunk_size = current_app.config['BULK_CHUNK_SIZE']
+
+            errors = []
+            received = 0
+            ops, indexes = [], []
+            write_failed = False
+
+            for index, item in self._bulk_items():
+                if index >= max_items:
+                    errors.append({"index": index, "message": f"Batch is limited to {max_items} items"})
+                    break
+                received += 1
+                try:
+                    if isinstance(item, CustomError):
+                        raise item
+                    ops.append(build_op(item))
+                    indexes.append(index)
+                except CustomError as ce:
+                    errors.append({"index": index, "message": str(ce)})
+                    if ordered:
+                        # Ordered mode still applies the valid items before the failure
+                        break
+                    continue
+
+                if len(ops) >= chunk_size:
+                    if not self._flush_bulk(ops, indexes, ordered, totals, errors) and ordered:
+                        write_failed = True
+                        break
+                    ops, indexes = [], []
+
+            if ops and not write_failed:
+                self._flush_bulk(ops, indexes, ordered, totals, errors)
+
+            response = {
+                "status": "fail" if errors else "success",
+                "ordered": ordered,
+                "received": received,
+                **self._bulk_counts(totals),
+                "errors": sorted(errors, key=lambda error: error['index'])
+            }
+            # 207 Multi-Status: some items may have been written, see "errors"
+            return jsonify(response), 207 if errors else success_code
+        except CustomError as ce:
+            return jsonify({"status": "fail", "message": str(ce), **self._bulk_counts(totals)}), ce.status_code
+        except RequestEntityTooLarge:
+            return jsonify({"status": "fail", "message": "Request body too large", **self._bulk_counts(totals)}), 413
+        except Exception as e:
+            return jsonify({"status": "fail", "message": f"Error running bulk write: {str(e)}",
+                            **self._bulk_counts(totals)}), 500
+        finally:
+            # Whatever was written before a failure still invalidates caches, stats and leaderboards
+            if any(totals.values()):
+                self.after_write()
+
 
 # from flask import jsonify, request
 # from pymongo import MongoClient
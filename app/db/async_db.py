@@ -0,0 +1,28 @@
+from quart import current_app
+from app.db.db import MongoPool
+
+# ✅ Motor is only needed for the optional async (ASGI) serving mode
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient
+except ImportError:  # pragma: no cover - depends on the environment
+    AsyncIOMotorClient = None
+
+
+class AsyncMongoPool(MongoPool):
+    """Same pool settings and fork handling as MongoPool, on the Motor driver.
+
+    The client is created on first use, i.e. inside the server's event loop.
+    """
+
+    def _create_client(self):
+        if AsyncIOMotorClient is None:
+            raise ImportError("❗ The async app needs the 'motor' package (pip install motor)")
+        return AsyncIOMotorClient(self.config['MONGO_URI'], **self.client_options())
+
+
+def init_async_db(app):
+    app.extensions['mongo'] = AsyncMongoPool(app.config)
+
+
+def get_async_db():
+    return current_app.extensions['mongo'].db
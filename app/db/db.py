@@ -1,27 +1,71 @@
 # app/db.py
-from pymongo import MongoClient
-from dotenv import load_dotenv
 import os
+import threading
+from flask import current_app
+from pymongo import MongoClient
+
+
+class MongoPool:
+    """One MongoClient (and its connection pool) per worker process.
+
+    pymongo clients are not fork-safe, so the client is created lazily on
+    first use and dropped in the child after a fork. Each gunicorn worker
+    therefore builds its own pool instead of inheriting the master's.
+    """
+
+    def __init__(self, config):
+        self.config = config
+        # pymongo monitoring listeners (e.g. metrics), registered before the client is built
+        self.event_listeners = []
+        self._client = None
+        self._lock = threading.Lock()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
 
-# Load environment variables
-load_dotenv()
+    def _reset_after_fork(self):
+        # Never close() the inherited client in the child, just forget it
+        self._client = None
+        self._lock = threading.Lock()
 
-# Create a global MongoDB client
-client = None
-db = None
+    def client_options(self):
+        return dict(
+            maxPoolSize=self.config['MONGO_MAX_POOL_SIZE'],
+            minPoolSize=self.config['MONGO_MIN_POOL_SIZE'],
+            maxIdleTimeMS=self.config['MONGO_MAX_IDLE_TIME_MS'],
+            waitQueueTimeoutMS=self.config['MONGO_WAIT_QUEUE_TIMEOUT_MS'],
+            serverSelectionTimeoutMS=self.config['MONGO_SERVER_SELECTION_TIMEOUT_MS'],
+            event_listeners=self.event_listeners,
+            connect=False,
+        )
 
-def init_db():
-    global client, db
+    def _create_client(self):
+        factory = self.config.get('MONGO_CLIENT_FACTORY') or MongoClient
+        return factory(self.config['MONGO_URI'], **self.client_options())
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._create_client()
+        return self._client
+
+    @property
+    def db(self):
+        return self.client[self.config['MONGO_DB_NAME']]
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+
+def init_db(app):
     try:
-        conn_str = os.getenv('CONN_STR')
-        if not conn_str:
-            raise ValueError("❗ Connection string not found in environment variables.")
-        client = MongoClient(conn_str)
-        db = client['my-db']
+        app.extensions['mongo'] = MongoPool(app.config)
     except Exception as e:
         raise Exception(f"Error initializing the database: {str(e)}")
 
+
 def get_db():
-    if db is None:
-        init_db()
-    return db
+    return current_app.extensions['mongo'].db
@@ -0,0 +1,123 @@
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from app.Models.movie_search import SEARCH_FIELD, TEXT_INDEX_WEIGHTS
+
+# ✅ Declared indexes for the movies collection (created at startup)
+MOVIE_INDEXES = [
+    [('release_year', ASCENDING)],
+    [('genres', ASCENDING)],
+    # Top-N by rating, total_rating then _id break ties (/highest-rated)
+    [('ratings', DESCENDING), ('total_rating', DESCENDING), ('_id', ASCENDING)],
+    [('price', ASCENDING)],
+    [('created_at', DESCENDING)],
+    # Compound filter + sort pairs used by the list and genre routes
+    [('genres', ASCENDING), ('created_at', DESCENDING)],
+    [('genres', ASCENDING), ('ratings', DESCENDING), ('total_rating', DESCENDING), ('_id', ASCENDING)],
+    [('release_year', ASCENDING), ('ratings', DESCENDING), ('total_rating', DESCENDING), ('_id', ASCENDING)],
+    [('release_year', ASCENDING), ('price', ASCENDING)],
+    # Edge n-gram prefixes for autocomplete, best rated first
+    [(SEARCH_FIELD, ASCENDING), ('ratings', DESCENDING)],
+]
+
+# ✅ One weighted text index per collection (MongoDB allows only one)
+TEXT_INDEX = [(field, TEXT) for field in TEXT_INDEX_WEIGHTS]
+TEXT_INDEX_OPTIONS = {'name': 'movie_text', 'weights': TEXT_INDEX_WEIGHTS}
+
+# Fields that are always indexed by MongoDB itself
+BUILTIN_INDEXED_FIELDS = {'_id'}
+
+# Plan stages that read from an index rather than scanning the collection
+INDEX_STAGES = {'IXSCAN', 'DISTINCT_SCAN', 'IDHACK', 'EXPRESS_IXSCAN', 'EXPRESS_IDHACK', 'COUNT_SCAN', 'TEXT_MATCH'}
+
+
+# ✅ Indexes for collections derived from movies
+STATS_INDEXES = [
+    [('_id.kind', ASCENDING), ('movie_total', DESCENDING)],
+]
+
+
+def ensure_indexes(db):
+    models = [IndexModel(keys) for keys in MOVIE_INDEXES]
+    models.append(IndexModel(TEXT_INDEX, **TEXT_INDEX_OPTIONS))
+    created = db['movies'].create_indexes(models)
+    created += db['movie_stats'].create_indexes([IndexModel(keys) for keys in STATS_INDEXES])
+    return created
+
+
+def is_filter_supported(field):
+    # A filter can use an index when the field leads at least one declared index
+    return field in BUILTIN_INDEXED_FIELDS or any(keys[0][0] == field for keys in MOVIE_INDEXES)
+
+
+def is_sort_supported(sort_fields, equality_fields=()):
+    """Whether a declared index can return documents in this sort order.
+
+    The sort must match an index prefix (or its exact reverse), optionally
+    after equality-filtered leading fields, e.g. genres=Drama&sort=-ratings.
+    """
+    sort_fields = [(field, direction) for field, direction in sort_fields if field != '_id']
+    if not sort_fields:
+        return True
+
+    reversed_sort = [(field, -direction) for field, direction in sort_fields]
+    for keys in MOVIE_INDEXES:
+        start = 0
+        while start < len(keys) and keys[start][0] in equality_fields:
+            start += 1
+        candidates = {tuple(keys[:len(sort_fields)]), tuple(keys[start:start + len(sort_fields)])}
+        if tuple(sort_fields) in candidates or tuple(reversed_sort) in candidates:
+            return True
+    return False
+
+
+def explain_pipeline(db, pipeline, collection_name='movies'):
+    """Runs explain on an aggregation and reports whether it uses an index."""
+    explain = db.command(
+        'explain',
+        {'aggregate': collection_name, 'pipeline': pipeline, 'cursor': {}},
+        verbosity='queryPlanner',
+    )
+
+    stages, index_names = [], []
+    for plan in _find_winning_plans(explain):
+        _collect_stages(plan, stages, index_names)
+
+    if 'COLLSCAN' in stages:
+        scan = 'COLLSCAN'
+    elif INDEX_STAGES.intersection(stages):
+        scan = 'IXSCAN'
+    else:
+        scan = 'UNKNOWN'
+
+    return {
+        "scan": scan,
+        "in_memory_sort": 'SORT' in stages,
+        "indexes": sorted(set(index_names)),
+        "stages": stages,
+    }
+
+
+def _find_winning_plans(node):
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == 'winningPlan':
+                # Slot-based engine nests the classic-style plan under queryPlan
+                yield value.get('queryPlan', value)
+            else:
+                yield from _find_winning_plans(value)
+    elif isinstance(node, list):
+        for item in node:
+            yield from _find_winning_plans(item)
+
+
+def _collect_stages(plan, stages, index_names):
+    if not isinstance(plan, dict):
+        return
+    if 'stage' in plan:
+        stages.append(plan['stage'])
+    if 'indexName' in plan:
+        index_names.append(plan['indexName'])
+    if 'inputStage' in plan:
+        _collect_stages(plan['inputStage'], stages, index_names)
+    for child in plan.get('inputStages', []):
+        _collect_stages(child, stages, index_names)
+
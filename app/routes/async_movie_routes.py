@@ -0,0 +1,43 @@
+from quart import Blueprint
+from app.controllers.async_movie_controller import AsyncMovieController
+
+# ✅ Create Blueprint (async twin of movie_routes.py for the ASGI app)
+async_movie_bp = Blueprint('movies', __name__)
+
+# ✅ Create Controller Instance
+movie_controller = AsyncMovieController()
+
+# ✅ Get All Movies
+@async_movie_bp.route('/', methods=['GET'])
+async def get_all_movies():
+    return await movie_controller.get_all_movies()
+
+# ✅ Get Highest Rated Movies
+@async_movie_bp.route('/highest-rated', methods=['GET'])
+async def get_highest_rated():
+    return await movie_controller.get_highest_rated()
+
+# ✅ Get Single Movie by ID
+@async_movie_bp.route('/<string:movie_id>', methods=['GET'])
+async def get_single_movie(movie_id):
+    return await movie_controller.get_single_movie(movie_id)
+
+# ✅ Create a New Movie
+@async_movie_bp.route('/', methods=['POST'])
+async def create_movie():
+    return await movie_controller.create_movie()
+
+# ✅ Update Movie
+@async_movie_bp.route('/<string:movie_id>', methods=['PATCH'])
+async def update_movie(movie_id):
+    return await movie_controller.update_movie(movie_id)
+
+# ✅ Delete Movie
+@async_movie_bp.route('/<string:movie_id>', methods=['DELETE'])
+async def delete_movie(movie_id):
+    return await movie_controller.delete_movie(movie_id)
+
+# ✅ Get Movies by Genre
+@async_movie_bp.route('/movies-by-genre/<string:genre>', methods=['GET'])
+async def get_movies_by_genre(genre):
+    return await movie_controller.get_movies_by_genre(genre)
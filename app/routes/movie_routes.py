@@ -1,5 +1,14 @@
-from flask import Blueprint 
+import json
+from urllib.parse import parse_qsl
+import click
+from flask import Blueprint
+from pymongo import UpdateOne
+from werkzeug.datastructures import MultiDict
 from app.controllers.movie_controller import MovieController
+from app.db.db import get_db
+from app.db.indexes import ensure_indexes
+from app.Models.movie_search import PREFIX_SOURCE_FIELDS, SEARCH_FIELD, edge_ngrams
+from app.Models.movie_stats import rebuild_stats
 
 # ✅ Create Blueprint
 movie_bp = Blueprint('movies', __name__)
@@ -17,6 +26,34 @@ def get_all_movies():
 def get_highest_rated():
     return movie_controller.get_highest_rated()
 
+# ✅ Search Movies (?q=... full text, or &mode=prefix for autocomplete)
+@movie_bp.route('/search', methods=['GET'])
+def search_movies():
+    return movie_controller.search_movies()
+
+# ✅ Get Movie Stats (materialized, per year / genre / director)
+@movie_bp.route('/stats', methods=['GET'])
+def get_movie_stats():
+    return movie_controller.get_movie_stats()
+
+# ✅ Explain a Query (IXSCAN or COLLSCAN?)
+@movie_bp.route('/explain', methods=['GET'])
+def explain_movies():
+    return movie_controller.explain_movies()
+
+# ✅ Bulk Create / Update / Delete (JSON array or NDJSON)
+@movie_bp.route('/bulk', methods=['POST'])
+def bulk_create_movies():
+    return movie_controller.bulk_create_movies()
+
+@movie_bp.route('/bulk', methods=['PATCH'])
+def bulk_update_movies():
+    return movie_controller.bulk_update_movies()
+
+@movie_bp.route('/bulk', methods=['DELETE'])
+def bulk_delete_movies():
+    return movie_controller.bulk_delete_movies()
+
 # ✅ Get Single Movie by ID
 @movie_bp.route('/<string:movie_id>', methods=['GET'])
 def get_single_movie(movie_id):
@@ -42,6 +79,42 @@ def delete_movie(movie_id):
 def get_movies_by_genre(genre):
     return movie_controller.get_movies_by_genre(genre)
 
+# ✅ CLI: flask --app run movies explain "genres=Drama&sort=-ratings"
+@movie_bp.cli.command('explain')
+@click.argument('query_string', default='')
+def explain_command(query_string):
+    query_params = MultiDict(parse_qsl(query_string, keep_blank_values=True))
+    report = movie_controller.explain_query(query_params)
+    click.echo(json.dumps(report, indent=2, default=str))
+
+# ✅ CLI: flask --app run movies create-indexes
+@movie_bp.cli.command('create-indexes')
+def create_indexes_command():
+    for name in ensure_indexes(get_db()):
+        click.echo(f"✅ {name}")
+
+# ✅ CLI: flask --app run movies refresh-stats (e.g. from cron)
+@movie_bp.cli.command('refresh-stats')
+def refresh_stats_command():
+    if rebuild_stats(get_db()):
+        click.echo("✅ Movie stats rebuilt")
+    else:
+        click.echo("❗ Another process is rebuilding the stats, try again later")
+
+# ✅ CLI: flask --app run movies backfill-search (prefixes for movies created before search)
+@movie_bp.cli.command('backfill-search')
+def backfill_search_command():
+    movies = get_db()['movies']
+    ops = []
+    for movie in movies.find({}, {field: 1 for field in PREFIX_SOURCE_FIELDS}):
+        ops.append(UpdateOne({"_id": movie["_id"]}, {"$set": {SEARCH_FIELD: edge_ngrams(movie)}}))
+        if len(ops) >= 1000:
+            movies.bulk_write(ops, ordered=False)
+            ops = []
+    if ops:
+        movies.bulk_write(ops, ordered=False)
+    click.echo("✅ Search prefixes rebuilt")
+
 
 # from flask import Blueprint, current_app
 # from app.controllers.movie_controller import MovieController
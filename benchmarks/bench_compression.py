@@ -0,0 +1,76 @@
+"""Bytes on the wire and CPU cost per compression level for a movie list page.
+
+Compresses the JSON of one page (default 100 full movie documents, as returned by
+GET /api/v1/movies/?view=full) with every available encoding and level. brotli and
+zstd are measured only when the brotli / zstandard packages are installed.
+
+    python -m benchmarks.bench_compression --docs 100 --repeat 50
+    python -m benchmarks.bench_compression --view summary --output compression.json
+"""
+import argparse
+import json
+import time
+from flask import Flask
+from app.Models.movie_model import PROJECTIONS
+from app.Utils.compression import available_encodings, compress
+from app.Utils.json_provider import MongoJSONProvider
+from benchmarks.bench_serialization import make_documents
+
+LEVELS = {
+    'gzip': [1, 3, 6, 9],
+    'br': [1, 3, 5, 8, 11],
+    'zstd': [1, 3, 6, 12, 19],
+}
+
+
+def page_body(docs, view):
+    documents = make_documents(docs)
+    projection = PROJECTIONS[view]
+    if any(projection.values()):
+        documents = [{k: v for k, v in doc.items() if k in projection or k == '_id'} for doc in documents]
+    provider = MongoJSONProvider(Flask(__name__))
+    return provider.dumps_bytes({"status": "success", "count": len(documents), "data": documents})
+
+
+def measure(encoding, level, body, repeat):
+    # process_time is CPU time, so other load on the machine doesn't count
+    started = time.process_time()
+    for _ in range(repeat):
+        compressed = compress(encoding, body, level)
+    cpu_ms = (time.process_time() - started) * 1000 / repeat
+    return {
+        "encoding": encoding,
+        "level": level,
+        "bytes": len(compressed),
+        "ratio": round(len(body) / len(compressed), 2),
+        "cpu_ms": round(cpu_ms, 3),
+        "mb_per_second": round(len(body) / 1e6 / (cpu_ms / 1000), 1) if cpu_ms else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=100)
+    parser.add_argument('--view', default='full', choices=list(PROJECTIONS))
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--output', help='write the results as JSON')
+    args = parser.parse_args()
+
+    body = page_body(args.docs, args.view)
+    print(f"identity: {len(body)} bytes ({args.docs} docs, view={args.view})")
+
+    results = []
+    for encoding in available_encodings(['gzip', 'br', 'zstd']):
+        for level in LEVELS[encoding]:
+            result = measure(encoding, level, body, args.repeat)
+            results.append(result)
+            print(f"{encoding:<5} level {level:>2}  {result['bytes']:>8} bytes  {result['ratio']:>6}x  "
+                  f"{result['cpu_ms']:>8.3f} ms CPU  {result['mb_per_second']} MB/s")
+
+    if args.output:
+        with open(args.output, 'w') as out:
+            json.dump({"identity_bytes": len(body), "docs": args.docs, "view": args.view, "results": results}, out, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""Movie body validation throughput and per-object memory at 100k movies.
+
+Compares the old write path (a __dict__ Movie plus validate_list for every list
+field) with validate_movie() and the __slots__ Movie. Bodies are JSON-shaped
+(no ObjectId or datetime), like what the API and bulk endpoints receive.
+
+    python -m benchmarks.bench_movie_model --count 100000
+"""
+import argparse
+import gc
+import time
+import tracemalloc
+from datetime import datetime
+from app.Models.movie_model import Movie, validate_movie
+from benchmarks.bench_serialization import make_documents
+
+
+class DictMovie:
+    # The model before __slots__: every instance carries its own __dict__
+    def __init__(self, name, description, duration, release_year, genres, directors, cover_image, actors, price,
+                 ratings=None, total_rating=0, release_date=None, created_by='Nana Kwasi'):
+        self.name = name
+        self.description = description
+        self.duration = duration
+        self.ratings = ratings
+        self.total_rating = total_rating
+        self.release_year = release_year
+        self.release_date = release_date
+        self.created_at = datetime.now()
+        self.genres = genres
+        self.directors = directors
+        self.cover_image = cover_image
+        self.actors = actors
+        self.price = price
+        self.created_by = created_by
+
+
+def validate_list(value, field_name):
+    if not isinstance(value, list) or not all(isinstance(i, str) for i in value):
+        raise ValueError(f"{field_name} must be a list of strings.")
+
+
+def old_path(body):
+    movie = DictMovie(**body)
+    validate_list(movie.genres, 'Genres')
+    validate_list(movie.directors, 'Directors')
+    validate_list(movie.actors, 'Actors')
+    return movie
+
+
+def make_bodies(count):
+    bodies = make_documents(count)
+    for body in bodies:
+        del body['_id'], body['created_at']
+    return bodies
+
+
+def throughput(label, fn, bodies):
+    started = time.perf_counter()
+    for body in bodies:
+        fn(body)
+    seconds = time.perf_counter() - started
+    print(f"{label:<34} {len(bodies) / seconds:>12,.0f} items/sec")
+
+
+def memory(label, build, bodies):
+    # Only the model objects are measured: the field values are shared with the bodies
+    gc.collect()
+    tracemalloc.start()
+    objects = [build(body) for body in bodies]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<34} {current / len(objects):>12,.0f} bytes/object")
+    return objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--count', type=int, default=100000)
+    args = parser.parse_args()
+
+    bodies = make_bodies(args.count)
+    print(f"{args.count} movie bodies")
+
+    throughput("before: dict Movie + validate_list", old_path, bodies)
+    throughput("after: validate_movie", validate_movie, bodies)
+    throughput("after: __slots__ Movie", lambda body: Movie(**body), bodies)
+
+    memory("before: dict Movie", lambda body: old_path(body), bodies)
+    memory("after: __slots__ Movie", lambda body: Movie(**body), bodies)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Serialization cost per 1k movie documents: old _id loop + Flask's default
+provider vs MongoJSONProvider (orjson when installed, stdlib otherwise).
+
+    python -m benchmarks.bench_serialization --docs 1000 --repeat 200
+"""
+import argparse
+import copy
+import timeit
+from datetime import datetime, timedelta
+from bson import ObjectId
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+from app.Utils import json_provider
+from app.Utils.json_provider import MongoJSONProvider
+
+
+def make_documents(count):
+    now = datetime.now()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Movie {i}",
+            "description": "A long description of the movie plot. " * 5,
+            "duration": 90 + i % 60,
+            "ratings": round(i % 10 * 0.5, 1),
+            "total_rating": i % 1000,
+            "release_year": 1970 + i % 55,
+            "created_at": now - timedelta(days=i),
+            "genres": ["Drama", "Thriller"],
+            "directors": ["Some Director"],
+            "actors": ["Actor One", "Actor Two", "Actor Three"],
+            "cover_image": f"https://example.com/covers/{i}.jpg",
+            "price": 9.99,
+        }
+        for i in range(count)
+    ]
+
+
+def old_path(provider, documents):
+    # What the controllers used to do before returning jsonify(...)
+    for movie in documents:
+        movie['_id'] = str(movie['_id'])
+    return provider.dumps({"status": "success", "count": len(documents), "data": documents})
+
+
+def new_path(provider, documents):
+    return provider.dumps_bytes({"status": "success", "count": len(documents), "data": documents})
+
+
+def measure(label, fn, documents, repeat):
+    # Every run gets fresh documents so the old path really converts each _id
+    copies = [copy.deepcopy(documents) for _ in range(repeat)]
+    runs = iter(copies)
+    seconds = timeit.timeit(lambda: fn(next(runs)), number=repeat) / repeat
+    print(f"{label:<42} {seconds * 1000 * 1000 / len(documents):8.3f} ms per 1k docs")
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--docs', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    mongo_provider = MongoJSONProvider(app)
+
+    documents = make_documents(args.docs)
+    # The old path only handles the top-level _id; nested ObjectIds would make it fail
+    baseline = measure("before: _id loop + DefaultJSONProvider", lambda d: old_path(default_provider, d), documents, args.repeat)
+
+    fast = measure("after: MongoJSONProvider (orjson)" if json_provider.orjson else "after: MongoJSONProvider (stdlib)",
+                   lambda d: new_path(mongo_provider, d), documents, args.repeat)
+
+    if json_provider.orjson is not None:
+        saved, json_provider.orjson = json_provider.orjson, None
+        try:
+            measure("after: MongoJSONProvider (stdlib fallback)", lambda d: new_path(mongo_provider, d), documents, args.repeat)
+        finally:
+            json_provider.orjson = saved
+
+    print(f"speed-up: {baseline / fast:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""Load test every movie_bp route at a fixed concurrency and write the results as JSON.
+
+By default the app runs in-process (threaded werkzeug server) against mongomock,
+so no database is needed. Use --mongo-uri for a local mongod, or --target to drive
+an already running server (gunicorn, ASGI, ...) and --pids to sample its workers' RSS.
+
+    python -m benchmarks.load_test --movies 10000 --concurrency 16 --requests 500 --output bench.json
+    python -m benchmarks.load_test --mongo-uri mongodb://localhost:27017 --movies 100000
+    python -m benchmarks.load_test --target http://127.0.0.1:8000 --no-seed --pids 4242 4243
+
+Sync vs async: how much concurrency one process sustains within the same p99 budget
+
+    gunicorn -w 1 run:app --bind 127.0.0.1:8000
+    hypercorn -w 1 app.asgi:app --bind 127.0.0.1:8001
+    python -m benchmarks.load_test --target http://127.0.0.1:8000 --no-seed --routes single list \
+        --sweep 1 4 16 64 256 --p99-budget-ms 100 --output sync.json
+    python -m benchmarks.load_test --target http://127.0.0.1:8001 --no-seed --routes single list \
+        --sweep 1 4 16 64 256 --p99-budget-ms 100 --output async.json
+
+Compare two runs (e.g. before/after a change to ApiFeatures) by diffing the JSON files.
+mongomock implements neither $merge, explain nor $text, so the stats, explain and
+full-text search routes only succeed against a real mongod.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from app.Models.movie_search import with_search_fields
+
+GENRES = ['Action', 'Comedy', 'Drama', 'Horror', 'Romance', 'Sci-Fi', 'Thriller', 'Animation']
+API = '/api/v1/movies'
+
+
+def make_movie(i, rng):
+    return with_search_fields({
+        "name": f"Movie {i}",
+        "title": f"Movie {i}",
+        "description": "A long description of the movie plot. " * 5,
+        "duration": rng.randint(80, 180),
+        "ratings": round(rng.uniform(1, 10), 1),
+        "total_rating": rng.randint(0, 100000),
+        "release_year": rng.randint(1950, 2025),
+        "created_at": datetime(2020, 1, 1) if i % 2 else datetime(2024, 6, 1),
+        "genres": rng.sample(GENRES, 2),
+        "directors": [f"Director {rng.randint(1, 2000)}"],
+        "actors": [f"Actor {rng.randint(1, 20000)}" for _ in range(3)],
+        "cover_image": f"https://example.com/covers/{i}.jpg",
+        "price": round(rng.uniform(1, 20), 2),
+    })
+
+
+def seed(db, count, batch_size=10000):
+    rng = random.Random(42)
+    db['movies'].delete_many({})
+    for start in range(0, count, batch_size):
+        db['movies'].insert_many([make_movie(i, rng) for i in range(start, min(start + batch_size, count))])
+    return [str(doc['_id']) for doc in db['movies'].find({}, {'_id': 1}).limit(1000)]
+
+
+def build_scenarios(movie_ids):
+    """Returns {name: fn(i) -> (method, path, json_body)} for every movie_bp route."""
+    # Deletes use the second half of the seeded ids so reads keep finding theirs
+    victims = list(movie_ids[len(movie_ids) // 2:]) or list(movie_ids)
+    read_ids = movie_ids[:max(1, len(movie_ids) // 2)]
+    new_movie = {"name": "Load Test", "release_year": 2024, "genres": ["Drama"], "price": 9.99}
+
+    return {
+        "list": lambda i: ('GET', f"{API}/?page={i % 20 + 1}&limit=50", None),
+        "list_filtered_sorted": lambda i: ('GET', f"{API}/?genres=Drama&sort=-ratings&limit=20&page={i % 10 + 1}", None),
+        "list_cursor": lambda i: ('GET', f"{API}/?sort=-ratings&limit=50&cursor=", None),
+        "highest_rated": lambda i: ('GET', f"{API}/highest-rated?limit={5 + i % 5}", None),
+        "single": lambda i: ('GET', f"{API}/{read_ids[i % len(read_ids)]}", None),
+        "search": lambda i: ('GET', f"{API}/search?q=movie%20{i % 1000}&limit=20", None),
+        "search_prefix": lambda i: ('GET', f"{API}/search?q=movie%20{i % 100}&mode=prefix&limit=10", None),
+        "by_genre": lambda i: ('GET', f"{API}/movies-by-genre/{GENRES[i % len(GENRES)]}?limit=20", None),
+        "stats": lambda i: ('GET', f"{API}/stats?by=release_year,genre&limit=20", None),
+        "explain": lambda i: ('GET', f"{API}/explain?genres=Drama&sort=-ratings", None),
+        "create": lambda i: ('POST', f"{API}/", dict(new_movie)),
+        "update": lambda i: ('PATCH', f"{API}/{read_ids[i % len(read_ids)]}", {"price": round(1 + i % 19 + 0.99, 2)}),
+        "delete": lambda i: ('DELETE', f"{API}/{victims[i % len(victims)]}", None),
+        "bulk_create": lambda i: ('POST', f"{API}/bulk?ordered=false", [dict(new_movie) for _ in range(50)]),
+        "bulk_update": lambda i: ('PATCH', f"{API}/bulk", [{"_id": movie_id, "price": 4.99} for movie_id in read_ids[:50]]),
+        "bulk_delete": lambda i: ('DELETE', f"{API}/bulk?ordered=false", victims[(i * 5) % len(victims):(i * 5) % len(victims) + 5]),
+    }
+
+
+def send(base_url, method, path, body, timeout):
+    data = json.dumps(body).encode() if body is not None else None
+    request = urllib.request.Request(base_url + path, data=data, method=method)
+    if data is not None:
+        request.add_header('Content-Type', 'application/json')
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        e.read()
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return time.perf_counter() - started, status
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(base_url, make_request, total_requests, concurrency, timeout):
+    latencies, errors = [], 0
+    lock = threading.Lock()
+    counter = iter(range(total_requests))
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                i = next(counter, None)
+            if i is None:
+                return
+            method, path, body = make_request(i)
+            elapsed, status = send(base_url, method, path, body, timeout)
+            with lock:
+                latencies.append(elapsed)
+                if status == 0 or status >= 400:
+                    errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    to_ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / wall, 1) if wall else None,
+        "p50_ms": to_ms(percentile(latencies, 50)),
+        "p95_ms": to_ms(percentile(latencies, 95)),
+        "p99_ms": to_ms(percentile(latencies, 99)),
+        "max_ms": to_ms(latencies[-1] if latencies else None),
+    }
+
+
+def rss_mb(pid=None):
+    try:
+        with open(f"/proc/{pid or 'self'}/status") as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return round(int(line.split()[1]) / 1024, 1)
+    except OSError:
+        pass
+    if pid is None:
+        # ru_maxrss is KiB on Linux, bytes on macOS; this is the peak, not the current RSS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+    return None
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def start_in_process_server(args):
+    from werkzeug.serving import make_server
+    from app import create_app
+
+    # One client hammering the API is exactly what the rate limiter stops
+    config = {'CACHE_ENABLED': not args.no_cache, 'RATE_LIMIT_ENABLED': False}
+    if args.mongo_uri:
+        config['MONGO_URI'] = args.mongo_uri
+        config['MONGO_DB_NAME'] = args.db_name
+    else:
+        import mongomock
+        config['MONGO_CLIENT_FACTORY'] = mongomock.MongoClient
+
+    app = create_app(config)
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return app, server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--movies', type=int, default=10000, help="catalogue size to seed (10k/100k/1M)")
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=300, help="requests per route")
+    parser.add_argument('--routes', nargs='*', help="only run these scenarios")
+    parser.add_argument('--mongo-uri', help="use a real mongod instead of mongomock")
+    parser.add_argument('--db-name', default='flask-api-bench')
+    parser.add_argument('--target', help="drive an already running server instead of an in-process app")
+    parser.add_argument('--pids', nargs='*', type=int, default=[], help="worker pids to sample RSS from (with --target)")
+    parser.add_argument('--no-seed', action='store_true', help="use the data already in the database")
+    parser.add_argument('--no-cache', action='store_true', help="disable the response cache in the in-process app")
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--sweep', nargs='*', type=int, help="run the routes at each of these concurrency levels")
+    parser.add_argument('--p99-budget-ms', type=float, default=100, help="p99 budget used to summarize --sweep")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    server = None
+    if args.target:
+        base_url = args.target.rstrip('/')
+        if args.mongo_uri and not args.no_seed:
+            from pymongo import MongoClient
+            movie_ids = seed(MongoClient(args.mongo_uri)[args.db_name], args.movies)
+        else:
+            with urllib.request.urlopen(f"{base_url}{API}/?fields=_id&limit=1000") as response:
+                movie_ids = [movie['_id'] for movie in json.loads(response.read())['data']]
+    else:
+        app, server, base_url = start_in_process_server(args)
+        with app.app_context():
+            db = app.extensions['mongo'].db
+            if args.no_seed:
+                movie_ids = [str(doc['_id']) for doc in db['movies'].find({}, {'_id': 1}).limit(1000)]
+            else:
+                print(f"Seeding {args.movies} movies...", file=sys.stderr)
+                movie_ids = seed(db, args.movies)
+
+    scenarios = build_scenarios(movie_ids)
+    if args.routes:
+        scenarios = {name: fn for name, fn in scenarios.items() if name in args.routes}
+
+    results = {}
+    for name, make_request in scenarios.items():
+        results[name] = run_scenario(base_url, make_request, args.requests, args.concurrency, args.timeout)
+        print(f"{name:<22} {results[name]['rps']:>8} rps  p50 {results[name]['p50_ms']:>8} ms  "
+              f"p95 {results[name]['p95_ms']:>8} ms  p99 {results[name]['p99_ms']:>8} ms  errors {results[name]['errors']}",
+              file=sys.stderr)
+
+    sweep = {}
+    for concurrency in args.sweep or []:
+        for name, make_request in scenarios.items():
+            result = run_scenario(base_url, make_request, args.requests, concurrency, args.timeout)
+            sweep.setdefault(name, {})[str(concurrency)] = result
+            print(f"sweep {name:<16} c={concurrency:<5} {result['rps']:>8} rps  p99 {result['p99_ms']:>8} ms", file=sys.stderr)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "backend": args.target or ('mongod' if args.mongo_uri else 'mongomock'),
+            "movies": args.movies,
+            "concurrency": args.concurrency,
+            "requests_per_route": args.requests,
+            "cache": not args.no_cache,
+        },
+        "routes": results,
+        "rss_mb": {str(pid): rss_mb(pid) for pid in args.pids} if args.target else {str(os.getpid()): rss_mb()},
+    }
+
+    if sweep:
+        report["sweep"] = {
+            name: {
+                "levels": levels,
+                # Highest concurrency that stayed within the p99 budget without errors
+                "max_concurrency_within_p99_budget": max(
+                    (int(level) for level, result in levels.items()
+                     if not result['errors'] and result['p99_ms'] is not None and result['p99_ms'] <= args.p99_budget_ms),
+                    default=None
+                ),
+            }
+            for name, levels in sweep.items()
+        }
+        report["meta"]["p99_budget_ms"] = args.p99_budget_ms
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# gunicorn picks this file up automatically: gunicorn run:app
+import os
+
+
+# ✅ Prometheus multiprocess mode: set PROMETHEUS_MULTIPROC_DIR to an empty directory
+# so /metrics aggregates every worker, and clean up after workers that exit.
+def child_exit(server, worker):
+    if os.getenv('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
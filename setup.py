@@ -5,7 +5,7 @@ setup(
     version='1.0.0',
     description='Flask app for Beginners',
     author='Your Name',
-    packages=find_packages(),
+    packages=find_packages(exclude=['tests', 'tests.*']),
     install_requires=[
         'Flask==3.0.2',
         'python-dotenv==1.0.1',
@@ -16,7 +16,8 @@ setup(
     ],
     entry_points={
         'console_scripts': [
-            'start-app = run:app'  # Similar to "start": "nodemon server.js"
+            'start-app = run:app',  # Similar to "start": "nodemon server.js"
+            'movies-catalogue = app.catalogue:cli'  # Bulk import/export of the movies collection
         ]
     },
     classifiers=[
@@ -0,0 +1,33 @@
+import mongomock
+import pytest
+from app import create_app
+
+API = '/api/v1/movies'
+
+
+@pytest.fixture
+def app():
+    # mongomock stands in for MongoDB (no $merge, explain, $text or change streams)
+    client = mongomock.MongoClient()
+    app = create_app({
+        'MONGO_CLIENT_FACTORY': lambda uri, **kwargs: client,
+        'CHANGE_WATCH_ENABLED': False,
+        'RATE_LIMIT_ENABLED': False,
+        'TESTING': True,
+    })
+    yield app
+
+
+@pytest.fixture
+def db(app):
+    return app.extensions['mongo'].db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def make_movie(**fields):
+    return {"name": "Inception", "release_year": 2010, "genres": ["Action", "Sci-Fi"], "ratings": 8.8,
+            "price": 9.99, **fields}
@@ -0,0 +1,119 @@
+import threading
+import pytest
+from flask import jsonify
+from app import create_app
+from app.routes import movie_routes
+from app.Utils.api_features import ApiFeatures, page_limit, page_number
+from app.Utils.custom_error import CustomError
+from app.Utils.rate_limit import MemoryRateLimiter
+from tests.conftest import API
+
+
+# ✅ ?page and ?limit
+
+@pytest.mark.parametrize('page', ['0', '-1', 'abc', '1.5'])
+def test_invalid_page_is_rejected(page):
+    with pytest.raises(CustomError) as error:
+        page_number({'page': page})
+    assert error.value.status_code == 400
+
+
+def test_page_zero_never_reaches_the_pipeline():
+    with pytest.raises(CustomError):
+        ApiFeatures(None, {'page': '0'}).paginate()
+
+
+def test_page_becomes_a_skip():
+    features = ApiFeatures(None, {'page': '3', 'limit': '10'}).paginate()
+    assert features.pipeline == [{'$skip': 20}, {'$limit': 10}]
+
+
+def test_limit_is_capped():
+    assert page_limit({'limit': '5000'}, max_limit=1000) == 1000
+    with pytest.raises(CustomError):
+        page_limit({'limit': '0'})
+
+
+def test_bad_page_is_400_on_every_list_route(client):
+    for path in ['/', '/highest-rated', '/movies-by-genre/Action']:
+        assert client.get(f"{API}{path}?page=0").status_code == 400
+        assert client.get(f"{API}{path}?page=abc").status_code == 400
+
+
+# ✅ Token buckets
+
+def test_bucket_allows_a_burst_then_refuses():
+    limiter = MemoryRateLimiter()
+    assert [limiter.take('ip:1', 1, rate=0.001, burst=3)[0] for _ in range(4)] == [True, True, True, False]
+    # Other clients have their own bucket
+    assert limiter.take('ip:2', 1, rate=0.001, burst=3)[0]
+
+
+def test_bucket_forgets_the_idlest_client():
+    limiter = MemoryRateLimiter(max_clients=2)
+    for key in ['a', 'b', 'c']:
+        limiter.take(key, 1, rate=1, burst=5)
+    assert list(limiter._buckets) == ['b', 'c']
+
+
+def limited_client(app, **config):
+    # The limiter is built by create_app, so a fresh app (on the same database) gets these settings
+    mongo = app.extensions['mongo'].client
+    settings = {'MONGO_CLIENT_FACTORY': lambda uri, **kwargs: mongo, 'RATE_LIMIT_ENABLED': True,
+                'RATE_LIMIT_PER_SECOND': 0.001, 'RATE_LIMIT_BURST': 4, **config}
+    return create_app({**app.config, **settings}).test_client()
+
+
+@pytest.fixture
+def limited(app):
+    return limited_client(app)
+
+
+def test_requests_past_the_burst_get_429(limited):
+    # A list page costs 2 tokens
+    assert [limited.get(f"{API}/?limit=10").status_code for _ in range(3)] == [200, 200, 429]
+    assert int(limited.get(f"{API}/?limit=10").headers['Retry-After']) >= 1
+
+
+def test_api_keys_have_their_own_bucket(limited):
+    for _ in range(2):
+        limited.get(f"{API}/?limit=10")
+    assert limited.get(f"{API}/?limit=10").status_code == 429
+    assert limited.get(f"{API}/?limit=10", headers={'X-API-Key': 'my-key'}).status_code == 200
+
+
+def test_clients_behind_trusted_proxies_have_their_own_bucket(app):
+    proxied = limited_client(app, TRUSTED_PROXY_COUNT=1)
+    for _ in range(2):
+        proxied.get(f"{API}/?limit=10", headers={'X-Forwarded-For': '203.0.113.1'})
+    assert proxied.get(f"{API}/?limit=10", headers={'X-Forwarded-For': '203.0.113.1'}).status_code == 429
+    assert proxied.get(f"{API}/?limit=10", headers={'X-Forwarded-For': '203.0.113.2'}).status_code == 200
+
+
+def test_large_pages_cost_more(limited):
+    # limit=300 costs 2 x 3 = 6 tokens, above the burst of 4, so the whole bucket is charged
+    assert limited.get(f"{API}/?limit=300").status_code == 200
+    assert limited.get(f"{API}/?limit=1").status_code == 429
+
+
+def test_in_flight_cap_sheds_load(app, monkeypatch):
+    client = limited_client(app, RATE_LIMIT_ENABLED=False, MAX_IN_FLIGHT_REQUESTS=1, IN_FLIGHT_WAIT_MS=1)
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_listing():
+        # Holds the only slot, as a request waiting on MongoDB would
+        entered.set()
+        release.wait(5)
+        return jsonify({"status": "success", "count": 0, "data": []})
+
+    monkeypatch.setattr(movie_routes.movie_controller, 'get_all_movies', slow_listing)
+    first = threading.Thread(target=client.get, args=(f"{API}/",))
+    first.start()
+    assert entered.wait(5)
+    try:
+        response = client.get(f"{API}/highest-rated")
+        assert response.status_code == 503
+    finally:
+        release.set()
+        first.join()
+    assert client.get(f"{API}/highest-rated").status_code == 200
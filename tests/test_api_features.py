@@ -0,0 +1,94 @@
+import mongomock
+import pytest
+from bson import json_util
+from pymongo.errors import ExecutionTimeout
+from app import create_app
+from app.Utils.api_features import has_unbounded_sort, optimize_pipeline
+from tests.conftest import API, make_movie
+
+
+# ✅ optimize_pipeline
+
+def test_optimize_pipeline_orders_stages_and_moves_the_limit_before_the_skip():
+    stages = [
+        {'$match': {'genres': 'Drama'}},
+        {'$project': {'name': 1}},
+        {'$sort': {'ratings': -1}},
+        {'$skip': 20},
+        {'$limit': 10},
+    ]
+    assert optimize_pipeline(stages) == [
+        {'$match': {'genres': 'Drama'}},
+        {'$sort': {'ratings': -1}},
+        {'$limit': 30},
+        {'$skip': 20},
+        {'$project': {'name': 1}},
+    ]
+
+
+def test_optimize_pipeline_merges_matches_and_drops_empty_stages():
+    stages = [{'$match': {}}, {'$match': {'genres': 'Drama'}}, {'$match': {'release_year': 2010}}, {'$project': {}}]
+    assert optimize_pipeline(stages) == [{'$match': {'genres': 'Drama', 'release_year': 2010}}]
+
+
+def test_optimize_pipeline_keeps_stages_after_the_page_window_in_place():
+    # A $match after the $limit filters the page, moving it first would change the result
+    stages = [{'$sort': {'ratings': -1}}, {'$limit': 5}, {'$match': {'genres': 'Drama'}}]
+    assert optimize_pipeline(stages) == stages
+
+
+def test_optimize_pipeline_keeps_unknown_stages_last():
+    facet = {'$facet': {'total': [{'$count': 'count'}]}}
+    assert optimize_pipeline([{'$match': {'genres': 'Drama'}}, facet]) == [{'$match': {'genres': 'Drama'}}, facet]
+
+
+# ✅ has_unbounded_sort
+
+def test_sort_followed_by_a_limit_is_bounded():
+    assert not has_unbounded_sort([{'$sort': {'ratings': -1}}, {'$limit': 10}])
+
+
+def test_sort_without_a_limit_is_unbounded():
+    assert has_unbounded_sort([{'$sort': {'ratings': -1}}, {'$project': {'name': 1}}])
+    assert has_unbounded_sort([{'$match': {}}, {'$sort': {'ratings': -1}}])
+
+
+def test_unbounded_sort_inside_a_facet():
+    assert has_unbounded_sort([{'$facet': {'page': [{'$sort': {'ratings': -1}}]}}])
+    assert not has_unbounded_sort([{'$facet': {'page': [{'$sort': {'ratings': -1}}, {'$limit': 1}]}}])
+
+
+# ✅ Aggregation policies, end to end
+
+@pytest.fixture
+def debug_client(app):
+    # The debug headers are installed by create_app, so a fresh app (on the same database) gets them
+    mongo = app.extensions['mongo'].client
+    settings = {'MONGO_CLIENT_FACTORY': lambda uri, **kwargs: mongo, 'QUERY_DEBUG_HEADERS': True,
+                'QUERY_MAX_TIME_MS': 2500, 'CACHE_ENABLED': False}
+    return create_app({**app.config, **settings}).test_client()
+
+
+def test_paged_reads_send_the_optimized_pipeline_with_max_time(debug_client):
+    debug_client.post(f"{API}/", json=make_movie())
+    response = debug_client.get(f"{API}/?sort=-ratings&page=3&limit=5")
+
+    stages = [list(stage)[0] for stage in json_util.loads(response.headers['X-Query-Pipeline'])]
+    assert stages[stages.index('$sort') + 1:stages.index('$sort') + 3] == ['$limit', '$skip']
+    assert json_util.loads(response.headers['X-Query-Options']) == {'maxTimeMS': 2500}
+
+
+def test_streamed_exports_have_no_time_limit_and_may_spill_to_disk(debug_client):
+    debug_client.post(f"{API}/", json=make_movie())
+    response = debug_client.get(f"{API}/?stream=1&sort=release_year")
+
+    assert json_util.loads(response.headers['X-Query-Options']) == {'allowDiskUse': True}
+
+
+def test_query_timeouts_answer_503(client, monkeypatch):
+    def timeout(*args, **kwargs):
+        raise ExecutionTimeout("operation exceeded time limit")
+
+    monkeypatch.setattr(mongomock.collection.Collection, 'aggregate', timeout)
+    response = client.get(f"{API}/")
+    assert response.status_code == 503
@@ -0,0 +1,71 @@
+import json
+from app.controllers.movie_controller import MovieController
+from tests.conftest import API, make_movie
+
+
+def ndjson(movies):
+    return ''.join(json.dumps(movie) + '\n' for movie in movies)
+
+
+def test_bulk_create_from_a_json_array(client):
+    response = client.post(f"{API}/bulk", json=[make_movie(name=f"Movie {i}") for i in range(3)])
+    assert response.status_code == 201
+    assert response.get_json()['inserted'] == 3
+
+
+def test_bulk_create_from_ndjson(client):
+    body = ndjson(make_movie(name=f"Movie {i}") for i in range(3))
+    response = client.post(f"{API}/bulk", data=body, content_type='application/x-ndjson')
+    assert response.get_json()['inserted'] == 3
+
+
+def test_ordered_bulk_stops_at_the_first_invalid_item(client):
+    items = [make_movie(), {"name": "No year"}, make_movie()]
+    response = client.post(f"{API}/bulk", json=items)
+    assert response.status_code == 207
+    body = response.get_json()
+    assert body['inserted'] == 1
+    assert body['errors'][0]['index'] == 1
+
+
+def test_unordered_bulk_skips_invalid_items(client):
+    items = [make_movie(), {"name": "No year"}, make_movie()]
+    response = client.post(f"{API}/bulk?ordered=false", json=items)
+    assert response.get_json()['inserted'] == 2
+
+
+def test_bulk_update_and_delete(client):
+    ids = [client.post(f"{API}/", json=make_movie()).get_json()['data']['_id'] for _ in range(2)]
+
+    updated = client.patch(f"{API}/bulk", json=[{"_id": movie_id, "price": 1.5} for movie_id in ids])
+    assert updated.get_json()['modified'] == 2
+
+    deleted = client.delete(f"{API}/bulk", json=ids)
+    assert deleted.get_json()['deleted'] == 2
+
+
+def test_malformed_json_delete_body_is_400(client):
+    response = client.delete(f"{API}/bulk", data='[{bad', content_type='application/json')
+    assert response.status_code == 400
+
+
+def test_failure_after_written_chunks_reports_them_and_invalidates(app, client, monkeypatch):
+    app.config['BULK_CHUNK_SIZE'] = 2
+    assert client.get(f"{API}/").get_json()['count'] == 0
+
+    flush = MovieController._flush_bulk
+    calls = []
+
+    def flush_then_fail(self, *args):
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("connection reset")
+        return flush(self, *args)
+
+    monkeypatch.setattr(MovieController, '_flush_bulk', flush_then_fail)
+    response = client.post(f"{API}/bulk", json=[make_movie(name=f"Movie {i}") for i in range(5)])
+    assert response.status_code == 500
+    assert response.get_json()['inserted'] == 2
+
+    # The cached empty list was invalidated by the two movies that were written
+    assert client.get(f"{API}/").get_json()['count'] == 2
@@ -0,0 +1,40 @@
+import pytest
+from app.Models.movie_leaderboard import LEADERBOARD_COLLECTION
+from app.Models.movie_stats import META_ID, STATS_COLLECTION
+from app.Utils.change_watcher import ChangeWatcher, made_by_api
+
+
+@pytest.mark.parametrize('change, expected', [
+    ({'operationType': 'update', 'updateDescription': {'updatedFields': {'price': 1, 'version': 2}}}, True),
+    ({'operationType': 'update', 'updateDescription': {'updatedFields': {'price': 1}}}, False),
+    ({'operationType': 'insert', 'fullDocument': {'name': 'x', 'version': 1}}, True),
+    ({'operationType': 'insert', 'fullDocument': {'name': 'x'}}, False),
+    ({'operationType': 'delete'}, False),
+])
+def test_made_by_api(change, expected):
+    assert made_by_api(change) is expected
+
+
+def shared_marks(db):
+    meta = db[STATS_COLLECTION].find_one({"_id": META_ID}) or {}
+    board = db[LEADERBOARD_COLLECTION].find_one({"_id": "meta"}) or {}
+    return meta.get('writes', 0), board.get('generation', 0)
+
+
+def test_only_one_watcher_invalidates_shared_data(app, db):
+    watchers = [ChangeWatcher(app) for _ in range(3)]
+    for watcher in watchers:
+        watcher.invalidate()
+    assert shared_marks(db) == (1, 1)
+
+
+def test_api_writes_leave_shared_data_alone(app, db):
+    ChangeWatcher(app).invalidate(outside_write=False)
+    assert shared_marks(db) == (0, 0)
+
+
+def test_watcher_marks_do_not_change_the_fingerprint(app):
+    watcher = ChangeWatcher(app)
+    before = watcher.fingerprint()
+    watcher.invalidate()
+    assert watcher.fingerprint() == before
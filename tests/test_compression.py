@@ -0,0 +1,60 @@
+import gzip
+import json
+from werkzeug.datastructures import Accept
+from app.Utils.compression import negotiate
+from tests.conftest import API, make_movie
+
+
+def seed(client, count):
+    for year in range(1950, 1950 + count):
+        client.post(f"{API}/", json=make_movie(name=f"Movie {year}", release_year=year))
+
+
+def test_negotiate_prefers_client_quality_then_server_order():
+    assert negotiate(Accept([('gzip', 1), ('br', 1)]), ['zstd', 'br', 'gzip']) == 'br'
+    assert negotiate(Accept([('gzip', 1), ('br', 0.5)]), ['br', 'gzip']) == 'gzip'
+    assert negotiate(Accept([('gzip', 0)]), ['gzip']) is None
+
+
+def test_large_json_is_gzipped_with_a_weak_etag(client):
+    seed(client, 30)
+    plain = client.get(f"{API}/?limit=30&sort=release_year")
+    response = client.get(f"{API}/?limit=30&sort=release_year", headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    assert gzip.decompress(response.get_data()) == plain.get_data()
+    assert response.headers['ETag'].startswith('W/')
+
+
+def test_cached_compressed_body_is_reused(client):
+    seed(client, 30)
+    url = f"{API}/?limit=30&sort=release_year"
+    first = client.get(url, headers={'Accept-Encoding': 'gzip'})
+    second = client.get(url, headers={'Accept-Encoding': 'gzip'})
+
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.get_data() == first.get_data()
+
+
+def test_small_bodies_and_refused_encodings_stay_plain(client):
+    created = client.post(f"{API}/", json=make_movie()).get_json()['data']
+
+    small = client.get(f"{API}/{created['_id']}", headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers
+    assert 'Accept-Encoding' in small.headers['Vary']
+
+    seed(client, 30)
+    refused = client.get(f"{API}/?limit=30", headers={'Accept-Encoding': 'gzip;q=0'})
+    assert 'Content-Encoding' not in refused.headers
+    assert refused.get_json()['count'] == 30
+
+
+def test_ndjson_stream_is_compressed_chunk_by_chunk(client):
+    seed(client, 5)
+    response = client.get(f"{API}/?stream=1&sort=release_year", headers={'Accept-Encoding': 'gzip'})
+
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Content-Length' not in response.headers
+    lines = gzip.decompress(response.get_data()).decode().splitlines()
+    assert [json.loads(line)['release_year'] for line in lines] == list(range(1950, 1955))
@@ -0,0 +1,83 @@
+import base64
+import pytest
+from bson import json_util
+from app.Utils.api_features import ApiFeatures
+from app.Utils.custom_error import CustomError
+from tests.conftest import API, make_movie
+
+
+def cursor_features(**params):
+    return ApiFeatures(None, {'cursor': '', **params}).sort()
+
+
+def make_token(features, values):
+    payload = json_util.dumps({'s': features._sort_signature(), 'v': values})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+# ✅ Cursor helpers
+
+def test_cursor_round_trip():
+    features = cursor_features()
+    token = features._encode_cursor({'_id': 7, 'created_at': 42})
+    assert features._decode_cursor(token) == [42, 7]
+
+
+@pytest.mark.parametrize('token', ['not-base64!', base64.urlsafe_b64encode(b'{"x": 1}').decode()])
+def test_malformed_cursor_is_rejected(token):
+    with pytest.raises(CustomError) as error:
+        cursor_features()._decode_cursor(token)
+    assert error.value.status_code == 400
+
+
+@pytest.mark.parametrize('values', [[{'$gt': ''}, 1], [1, ['a']], 'abc'])
+def test_cursor_values_cannot_carry_operators(values):
+    features = cursor_features()
+    with pytest.raises(CustomError, match='Invalid cursor'):
+        features._decode_cursor(make_token(features, values))
+
+
+def test_cursor_for_another_sort_is_rejected():
+    token = make_token(cursor_features(sort='price'), [10.0, 1])
+    with pytest.raises(CustomError, match='does not match'):
+        cursor_features()._decode_cursor(token)
+
+
+def test_cursor_match_builds_keyset_branches():
+    features = cursor_features(sort='price')
+    assert features._cursor_match([10.0, 5]) == {'$or': [
+        {'price': {'$gt': 10.0}},
+        {'price': 10.0, '_id': {'$gt': 5}},
+    ]}
+
+
+def test_after_condition_for_descending_sorts_includes_nulls():
+    assert ApiFeatures._after_condition('ratings', -1, 8.0) == {'$or': [{'ratings': {'$lt': 8.0}}, {'ratings': None}]}
+
+
+def test_after_condition_with_null_values():
+    # null sorts first: ascending continues with every non-null, descending has nothing after it
+    assert ApiFeatures._after_condition('ratings', 1, None) == {'ratings': {'$ne': None}}
+    assert ApiFeatures._after_condition('ratings', -1, None) is None
+
+
+@pytest.mark.parametrize('field', ['genres', '-directors', 'actors'])
+def test_cursor_mode_rejects_list_field_sorts(field):
+    with pytest.raises(CustomError, match="can't sort by"):
+        ApiFeatures(None, {'cursor': '', 'sort': field}).sort()
+
+
+def test_next_cursor_pages_through_every_movie(client):
+    for year in range(2000, 2005):
+        client.post(f"{API}/", json=make_movie(name=f"Movie {year}", release_year=year))
+
+    names, cursor = [], ''
+    while cursor is not None:
+        page = client.get(f"{API}/?sort=release_year&limit=2&cursor={cursor}").get_json()
+        names += [movie['name'] for movie in page['data']]
+        cursor = page['next']
+    assert names == [f"Movie {year}" for year in range(2000, 2005)]
+
+
+def test_list_field_sort_is_rejected_before_issuing_a_cursor(client):
+    assert client.get(f"{API}/?sort=genres&cursor=").status_code == 400
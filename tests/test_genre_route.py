@@ -0,0 +1,53 @@
+from app.Utils.api_features import ApiFeatures, merge_matches
+from tests.conftest import API, make_movie
+
+
+# ✅ merge_matches
+
+def test_merge_matches_combines_distinct_fields():
+    assert merge_matches([{'genres': 'Drama'}, {'release_year': 2010}]) == {'genres': 'Drama', 'release_year': 2010}
+
+
+def test_merge_matches_ands_clashing_fields():
+    assert merge_matches([{'genres': 'Drama'}, {'genres': 'Action'}]) == {
+        '$and': [{'genres': 'Drama'}, {'genres': 'Action'}]
+    }
+
+
+def test_merge_matches_skips_empty_matches():
+    assert merge_matches([{}, {'genres': 'Drama'}, None]) == {'genres': 'Drama'}
+
+
+# ✅ Route conditions
+
+def test_match_keeps_the_client_filter_on_the_same_field():
+    features = ApiFeatures(None, {'genres': 'Drama'}).filter().match({'genres': 'Action'})
+    assert features.pipeline[0] == {'$match': {'$and': [{'genres': 'Drama'}, {'genres': 'Action'}]}}
+
+
+def seed(client):
+    client.post(f"{API}/", json=make_movie(name="Heat", genres=["Action", "Drama"], release_year=1995))
+    client.post(f"{API}/", json=make_movie(name="Speed", genres=["Action"], release_year=1994))
+    client.post(f"{API}/", json=make_movie(name="Amelie", genres=["Comedy"], release_year=2001))
+
+
+def names(response):
+    return sorted(movie['name'] for movie in response.get_json()['data'])
+
+
+def test_genre_route_filters_by_genre(client):
+    seed(client)
+    assert names(client.get(f"{API}/movies-by-genre/Action")) == ["Heat", "Speed"]
+
+
+def test_genre_route_keeps_a_client_genre_filter(client):
+    seed(client)
+    assert names(client.get(f"{API}/movies-by-genre/Action?genres=Drama")) == ["Heat"]
+    assert names(client.get(f"{API}/movies-by-genre/Action?genres=Comedy")) == []
+
+
+def test_genre_route_facets_count_the_filtered_movies(client):
+    seed(client)
+    facets = client.get(f"{API}/movies-by-genre/Action?facets=1").get_json()['facets']
+    assert {row['key']: row['count'] for row in facets['genres']} == {"Action": 2, "Drama": 1}
+    assert {row['key'] for row in facets['release_years']} == {1994, 1995}
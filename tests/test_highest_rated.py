@@ -0,0 +1,32 @@
+from app.Models import movie_leaderboard
+from app.controllers import movie_controller
+from tests.conftest import API, make_movie
+
+
+def test_highest_rated_orders_by_ratings(client):
+    for ratings in [6.5, 9.1, 7.8]:
+        client.post(f"{API}/", json=make_movie(ratings=ratings))
+    movies = client.get(f"{API}/highest-rated").get_json()['data']
+    assert [movie['ratings'] for movie in movies] == [9.1, 7.8, 6.5]
+
+
+def test_ties_keep_their_order_across_the_stored_board_boundary(client, monkeypatch):
+    # Pages 1-2 come from a stored board of 4, pages 3-4 from the aggregate
+    monkeypatch.setattr(movie_leaderboard, 'LEADERBOARD_SIZE', 4)
+    monkeypatch.setattr(movie_controller, 'LEADERBOARD_SIZE', 4)
+    for i in range(8):
+        client.post(f"{API}/", json=make_movie(name=f"Movie {i}", ratings=8.0, total_rating=10))
+
+    names = []
+    for page in range(1, 5):
+        names += [movie['name'] for movie in client.get(f"{API}/highest-rated?limit=2&page={page}").get_json()['data']]
+    assert sorted(names) == sorted(f"Movie {i}" for i in range(8))
+
+
+def test_a_rating_change_shows_up_right_away(client):
+    low = client.post(f"{API}/", json=make_movie(name="Low", ratings=5.0)).get_json()['data']['_id']
+    client.post(f"{API}/", json=make_movie(name="High", ratings=9.0))
+    assert client.get(f"{API}/highest-rated").get_json()['data'][0]['name'] == "High"
+
+    client.patch(f"{API}/{low}", json={"ratings": 9.5})
+    assert client.get(f"{API}/highest-rated").get_json()['data'][0]['name'] == "Low"
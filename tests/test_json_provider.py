@@ -0,0 +1,70 @@
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+import pytest
+from bson import Decimal128, ObjectId
+from flask import Flask
+from app.Utils import json_provider
+from app.Utils.json_provider import MongoJSONProvider, bson_default
+
+MOVIE_ID = ObjectId('65f000000000000000000001')
+DOCUMENT = {
+    "_id": MOVIE_ID,
+    "name": "Inception",
+    "created_at": datetime(2024, 1, 2, 3, 4, 5),
+    "price": Decimal128('9.99'),
+    "genres": ["Action"],
+}
+EXPECTED = {
+    "_id": str(MOVIE_ID),
+    "name": "Inception",
+    "created_at": "2024-01-02T03:04:05",
+    "price": "9.99",
+    "genres": ["Action"],
+}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def provider(request, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr(json_provider, 'orjson', None)
+    elif json_provider.orjson is None:
+        pytest.skip("orjson is not installed")
+    flask_app = Flask(__name__)
+    flask_app.json = MongoJSONProvider(flask_app)
+    # The provider only keeps a weak reference to its app
+    yield flask_app.json
+
+
+def test_documents_serialize_without_converting_them_first(provider):
+    assert json.loads(provider.dumps(DOCUMENT)) == EXPECTED
+
+
+def test_field_order_is_kept(provider):
+    assert list(json.loads(provider.dumps(DOCUMENT))) == list(DOCUMENT)
+
+
+def test_loads_round_trip(provider):
+    assert provider.loads(provider.dumps(EXPECTED)) == EXPECTED
+
+
+def test_response_is_json(provider):
+    with provider._app.app_context():
+        response = provider.response(DOCUMENT)
+    assert response.mimetype == 'application/json'
+    assert json.loads(response.get_data()) == EXPECTED
+
+
+@pytest.mark.parametrize('value, expected', [
+    (Decimal('1.50'), '1.50'),
+    (uuid.UUID(int=1), '00000000-0000-0000-0000-000000000001'),
+    (b'\x00\x01', 'AAE='),
+])
+def test_bson_default(value, expected):
+    assert bson_default(value) == expected
+
+
+def test_unknown_types_still_fail(provider):
+    with pytest.raises(TypeError):
+        provider.dumps({"value": object()})
@@ -0,0 +1,57 @@
+from bson import ObjectId
+from app.Utils.response_cache import invalidate_cache
+from tests.conftest import API, make_movie
+
+
+def create(client):
+    return client.post(f"{API}/", json=make_movie()).get_json()['data']['_id']
+
+
+def test_get_answers_304_until_the_movie_changes(client, db):
+    movie_id = create(client)
+    etag = client.get(f"{API}/{movie_id}").headers['ETag']
+    assert etag.startswith('"v1-')
+
+    assert client.get(f"{API}/{movie_id}", headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_writes_outside_the_api_change_the_etag(client, app, db):
+    movie_id = create(client)
+    etag = client.get(f"{API}/{movie_id}").headers['ETag']
+
+    # A script that doesn't bump the version; the change watcher then drops the cached copy
+    db['movies'].update_one({'_id': ObjectId(movie_id)}, {'$set': {'price': 1.0}})
+    with app.app_context():
+        invalidate_cache('movies')
+
+    response = client.get(f"{API}/{movie_id}", headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['data']['price'] == 1.0
+
+
+def test_patch_with_the_current_etag_writes(client):
+    movie_id = create(client)
+    etag = client.get(f"{API}/{movie_id}").headers['ETag']
+
+    response = client.patch(f"{API}/{movie_id}", json={'price': 12.5}, headers={'If-Match': etag})
+    assert response.status_code == 200
+    assert response.get_json()['modified'] is True
+    assert response.headers['ETag'].startswith('"v2-')
+
+
+def test_patch_with_a_stale_version_is_412(client):
+    movie_id = create(client)
+    client.patch(f"{API}/{movie_id}", json={'price': 12.5})
+
+    response = client.patch(f"{API}/{movie_id}", json={'price': 3.0}, headers={'If-Match': '"v1"'})
+    assert response.status_code == 412
+    assert client.get(f"{API}/{movie_id}").get_json()['data']['price'] == 12.5
+
+
+def test_patch_that_changes_nothing_does_not_write(client):
+    movie_id = create(client)
+
+    response = client.patch(f"{API}/{movie_id}", json={'price': 9.99}, headers={'If-Match': '"v1"'})
+    assert response.status_code == 200
+    assert response.get_json()['modified'] is False
+    assert response.headers['ETag'].startswith('"v1-')
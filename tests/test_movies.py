@@ -0,0 +1,18 @@
+from tests.conftest import API, make_movie
+
+
+def test_create_returns_the_movie_without_internal_fields(client, db):
+    response = client.post(f"{API}/", json=make_movie())
+    assert response.status_code == 201
+    movie = response.get_json()['data']
+    assert 'search_prefixes' not in movie
+    assert movie['version'] == 1
+
+    # The stored document still gets them, so the movie is searchable
+    assert 'search_prefixes' in db['movies'].find_one()
+
+
+def test_create_rejects_an_invalid_body(client):
+    response = client.post(f"{API}/", json={"name": "No year"})
+    assert response.status_code == 400
+    assert response.get_json()['status'] == 'fail'
@@ -0,0 +1,107 @@
+from datetime import datetime
+import pytest
+from bson.objectid import ObjectId
+from app.Utils.custom_error import CustomError
+from app.Utils.query_compiler import bind_filter, coerce, compile_filter
+from tests.conftest import API, make_movie
+
+
+# ✅ compile_filter
+
+def test_compile_filter_splits_field_and_operator():
+    assert compile_filter(('genres', 'ratings__gte')) == (('genres', 'genres', 'eq'), ('ratings__gte', 'ratings', 'gte'))
+
+
+def test_compile_filter_is_cached_per_shape():
+    assert compile_filter(('price__lt',)) is compile_filter(('price__lt',))
+
+
+@pytest.mark.parametrize('key, message', [
+    ('budget', "Unknown filter field 'budget'"),
+    ('price__between', "Unknown filter operator 'between'"),
+    ('price__prefix', "'price' is not a text field"),
+])
+def test_compile_filter_rejects_bad_keys(key, message):
+    with pytest.raises(CustomError, match=message):
+        compile_filter((key,))
+
+
+def test_compile_filter_index_modes():
+    # 'description' leads no index
+    assert compile_filter(('description',), 'off') == (('description', 'description', 'eq'),)
+    assert compile_filter(('description',), 'downgrade') == ()
+    with pytest.raises(CustomError, match='no supporting index'):
+        compile_filter(('description',), 'reject')
+
+
+# ✅ bind_filter
+
+def test_bind_filter_builds_the_match():
+    terms = compile_filter(('genres', 'ratings__gte', 'ratings__lt'))
+    query = bind_filter(terms, {'genres': 'Drama', 'ratings__gte': '7', 'ratings__lt': '9.5'})
+    assert query == {'genres': 'Drama', 'ratings': {'$gte': 7.0, '$lt': 9.5}}
+
+
+def test_bind_filter_keeps_explicit_operators():
+    terms = compile_filter(('genres__ne', 'release_year__in'))
+    assert bind_filter(terms, {'genres__ne': 'Drama', 'release_year__in': '2010,2011'}) == {
+        'genres': {'$ne': 'Drama'},
+        'release_year': {'$in': [2010, 2011]},
+    }
+
+
+# ✅ coerce
+
+def test_coerce_uses_the_field_type():
+    movie_id = ObjectId()
+    assert coerce('release_year', 'eq', '2010') == 2010
+    assert coerce('price', 'gt', '9.99') == 9.99
+    assert coerce('_id', 'eq', str(movie_id)) == movie_id
+    assert coerce('created_at', 'gte', '2024-01-02') == datetime(2024, 1, 2)
+
+
+def test_coerce_exists_and_prefix():
+    assert coerce('ratings', 'exists', 'false') is False
+    assert coerce('name', 'prefix', 'Star (') == r'^Star\ \('
+
+
+@pytest.mark.parametrize('field, operator, value', [
+    ('release_year', 'eq', 'abc'),
+    ('_id', 'eq', 'not-an-id'),
+    ('ratings', 'exists', 'maybe'),
+    ('release_year', 'in', '2010,x'),
+])
+def test_coerce_rejects_bad_values(field, operator, value):
+    with pytest.raises(CustomError) as error:
+        coerce(field, operator, value)
+    assert error.value.status_code == 400
+
+
+# ✅ Filters through the list route
+
+def seed(client):
+    client.post(f"{API}/", json=make_movie(name="Heat", ratings=8.3, release_year=1995))
+    client.post(f"{API}/", json=make_movie(name="Speed", ratings=7.3, release_year=1994))
+
+
+def names(response):
+    return sorted(movie['name'] for movie in response.get_json()['data'])
+
+
+def test_list_route_binds_typed_filters(client):
+    seed(client)
+    assert names(client.get(f"{API}/?ratings__gte=8")) == ["Heat"]
+    assert names(client.get(f"{API}/?release_year__in=1994,2000")) == ["Speed"]
+    assert names(client.get(f"{API}/?name__prefix=Sp")) == ["Speed"]
+
+
+def test_list_route_rejects_bad_filters(client):
+    assert client.get(f"{API}/?budget=1").status_code == 400
+    assert client.get(f"{API}/?release_year=soon").status_code == 400
+
+
+def test_reject_mode_refuses_unindexed_filters(app, client):
+    app.config['QUERY_INDEX_MODE'] = 'reject'
+    response = client.get(f"{API}/?description=x")
+    assert response.status_code == 400
+    assert 'no supporting index' in response.get_json()['message']
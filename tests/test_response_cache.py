@@ -0,0 +1,77 @@
+import time
+from app.Utils.response_cache import MemoryCache
+from tests.conftest import API, make_movie
+
+
+def test_cache_key_keeps_encoded_separators_apart(client):
+    client.post(f"{API}/", json=make_movie(genres=["Drama"]))
+
+    poisoned = client.get(f"{API}/?genres=Drama%26limit%3D50")
+    assert poisoned.get_json()['count'] == 0
+
+    response = client.get(f"{API}/?genres=Drama&limit=50")
+    assert response.headers['X-Cache'] == 'MISS'
+    assert response.get_json()['count'] == 1
+
+
+def test_list_is_cached_whatever_the_argument_order(client):
+    client.post(f"{API}/", json=make_movie())
+
+    first = client.get(f"{API}/?limit=5&sort=name")
+    second = client.get(f"{API}/?sort=name&limit=5")
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.headers['ETag'] == first.headers['ETag']
+    assert second.get_data() == first.get_data()
+
+
+def test_list_answers_304_for_a_matching_etag(client):
+    client.post(f"{API}/", json=make_movie())
+    etag = client.get(f"{API}/").headers['ETag']
+
+    response = client.get(f"{API}/", headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.get_data() == b''
+
+
+def test_writes_invalidate_cached_lists(client):
+    client.post(f"{API}/", json=make_movie())
+    before = client.get(f"{API}/")
+
+    client.post(f"{API}/", json=make_movie(name="Memento", release_year=2000))
+    after = client.get(f"{API}/", headers={'If-None-Match': before.headers['ETag']})
+    assert after.status_code == 200
+    assert after.headers['X-Cache'] == 'MISS'
+    assert after.get_json()['count'] == 2
+
+
+def test_errors_are_not_cached(client):
+    for _ in range(2):
+        response = client.get(f"{API}/?page=0")
+        assert response.status_code == 400
+        assert 'X-Cache' not in response.headers
+
+
+def test_memory_cache_evicts_least_recently_used_and_by_bytes():
+    cache = MemoryCache(max_entries=2, max_bytes=10)
+    cache.set('a', 1, ttl=60, size=4)
+    cache.set('b', 2, ttl=60, size=4)
+    cache.get('a')
+    cache.set('c', 3, ttl=60, size=4)
+    assert cache.get('b') is None
+    assert cache.get('a') == 1
+
+    cache.set('big', 4, ttl=60, size=11)
+    assert cache.get('big') is None
+
+
+def test_memory_cache_expires_entries_and_drops_old_versions():
+    cache = MemoryCache()
+    cache.set('short', 1, ttl=0)
+    time.sleep(0.001)
+    assert cache.get('short') is None
+
+    cache.set('movies:v0:/api/v1/movies/?', b'body', ttl=60)
+    cache.bump_version('movies')
+    assert cache.get_version('movies') == 1
+    assert cache.get('movies:v0:/api/v1/movies/?') is None
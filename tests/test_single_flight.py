@@ -0,0 +1,85 @@
+import threading
+import time
+import pytest
+from app.Utils.single_flight import SingleFlight
+
+
+def run_followers(flight, key, count, fn):
+    outcomes = []
+    threads = [threading.Thread(target=lambda: outcomes.append(flight.do(key, fn))) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    # Gives the followers time to queue behind the leader before it finishes
+    time.sleep(0.1)
+    return threads, outcomes
+
+
+def test_concurrent_callers_share_the_leaders_result():
+    flight = SingleFlight(max_wait=5)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'rows'
+
+    leader = threading.Thread(target=lambda: flight.do('key', slow))
+    leader.start()
+    started.wait(5)
+    threads, outcomes = run_followers(flight, 'key', 3, lambda: pytest.fail("followers must not run"))
+    release.set()
+    for thread in [leader, *threads]:
+        thread.join(5)
+
+    assert calls == [1]
+    assert outcomes == [('rows', 'follower')] * 3
+
+
+def test_followers_run_their_own_call_when_the_leader_fails():
+    flight = SingleFlight(max_wait=5)
+    started, release = threading.Event(), threading.Event()
+
+    def failing():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("db down")
+
+    errors = []
+
+    def lead():
+        try:
+            flight.do('key', failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=lead)
+    leader.start()
+    started.wait(5)
+    threads, outcomes = run_followers(flight, 'key', 1, lambda: 'own rows')
+    release.set()
+    for thread in [leader, *threads]:
+        thread.join(5)
+
+    assert len(errors) == 1
+    assert outcomes == [('own rows', 'timeout')]
+
+
+def test_slow_leaders_time_out_and_keys_are_released():
+    flight = SingleFlight(max_wait=0.01)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return 'late'
+
+    leader = threading.Thread(target=lambda: flight.do('key', slow))
+    leader.start()
+    started.wait(5)
+    assert flight.do('key', lambda: 'own') == ('own', 'timeout')
+    release.set()
+    leader.join(5)
+
+    assert flight.do('key', lambda: 'fresh') == ('fresh', 'leader')
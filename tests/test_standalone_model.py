@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+import mongomock
+import pytest
+from app.Models import movie_model
+from app.Models.movie_stats import META_ID, STATS_COLLECTION
+
+
+@pytest.fixture
+def standalone(monkeypatch):
+    client = mongomock.MongoClient()
+    pool = movie_model.app.extensions['mongo']
+    monkeypatch.setitem(movie_model.app.config, 'MONGO_CLIENT_FACTORY', lambda uri, **kwargs: client)
+    monkeypatch.setattr(pool, '_client', None)
+    yield movie_model.app.test_client(), pool.db
+    pool._client = None
+
+
+def test_insert_movie_requires_the_model_fields(standalone):
+    client, _ = standalone
+    response = client.post('/movies', json={"name": "Inception", "release_year": 2010})
+    assert response.status_code == 400
+
+
+def test_stats_keep_the_bare_list_shape(standalone):
+    client, db = standalone
+    db[STATS_COLLECTION].insert_many([
+        {"_id": META_ID, "writes": 3, "built_from_writes": 3, "rebuilt_at": datetime.now(timezone.utc)},
+        {"_id": {"kind": "release_year", "key": 2010}, "movie_total": 2, "avg_price": 9.5},
+        {"_id": {"kind": "release_year", "key": 1999}, "movie_total": 1, "avg_price": 4.0},
+    ])
+    response = client.get('/movies/stats')
+    assert response.get_json() == [
+        {"_id": 1999, "movie_total": 1, "avg_price": 4.0},
+        {"_id": 2010, "movie_total": 2, "avg_price": 9.5},
+    ]
+    assert response.headers['X-Stats-Pending-Writes'] == '0'
@@ -0,0 +1,29 @@
+import json
+from tests.conftest import API, make_movie
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def seed(client, count):
+    for year in range(2000, 2000 + count):
+        client.post(f"{API}/", json=make_movie(name=f"Movie {year}", release_year=year))
+
+
+def test_stream_returns_every_movie_as_ndjson(client):
+    seed(client, 5)
+    response = client.get(f"{API}/?stream=1&sort=release_year")
+    assert response.mimetype == 'application/x-ndjson'
+    assert [movie['release_year'] for movie in ndjson(response)] == list(range(2000, 2005))
+
+
+def test_stream_with_a_cursor_returns_one_page_and_the_next_token(client):
+    seed(client, 5)
+    first = client.get(f"{API}/?stream=1&sort=release_year&cursor=&limit=3")
+    assert [movie['release_year'] for movie in ndjson(first)] == [2000, 2001, 2002]
+
+    token = first.headers['X-Next-Cursor']
+    last = client.get(f"{API}/?stream=1&sort=release_year&limit=3&cursor={token}")
+    assert [movie['release_year'] for movie in ndjson(last)] == [2003, 2004]
+    assert 'X-Next-Cursor' not in last.headers